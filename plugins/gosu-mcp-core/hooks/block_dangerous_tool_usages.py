@@ -137,6 +137,60 @@ import sys
 import re
 import shlex
 
+# Regex patterns are compiled once at import time instead of on every check
+
+# Whole-word "git" and "push" tokens, used to spot git push commands
+GIT_WORD_PATTERN = re.compile(r'\bgit\b')
+PUSH_WORD_PATTERN = re.compile(r'\bpush\b')
+
+# Dangerous git commands, matched against the lowercased, whitespace-normalized command
+DANGEROUS_GIT_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'git\s+reset\s+--hard',  # git reset --hard
+        # git clean patterns - all variants with -f are destructive:
+        # -f alone removes untracked files
+        # -fx removes untracked + ignored files
+        # -fX removes only ignored files
+        # -fd/-df removes untracked files and directories
+        r'git\s+clean\s+-[a-z]*f[a-z]*d',  # git clean with f before d: -fd, -fxd, -fdx, etc.
+        r'git\s+clean\s+-[a-z]*d[a-z]*f',  # git clean with d before f: -df, -dxf, -dfx, -xdf, etc.
+        r'git\s+clean\s+-f[a-z]*(?:\s|$)',  # git clean -f/-fx/-fX: destructive even without -d
+        r'git\s+reflog\s+expire\s+--expire=now\s+--all',  # git reflog expire --expire=now --all
+        r'git\s+branch\s+-d\s+.*',  # git branch -d <branch>
+        r'git\s+branch\s+-D\s+.*',  # git branch -D <branch>
+        r'git\s+tag\s+-d\s+.*',  # git tag -d <tag>
+        r'git\s+remote\s+remove\s+.*',  # git remote remove <name>
+        r'git\s+filter-branch',  # git filter-branch
+        r'git\s+update-ref\s+-d',  # git update-ref -d
+        r'git\s+checkout\s+--orphan',  # git checkout --orphan
+    )
+]
+
+def combine_patterns(patterns):
+    """Fuse compiled patterns into one alternation that matches wherever any of them would."""
+    return re.compile('|'.join(f'(?:{pattern.pattern})' for pattern in patterns))
+
+# Single-pass scanner for all dangerous git command patterns
+DANGEROUS_GIT_PATTERN = combine_patterns(DANGEROUS_GIT_PATTERNS)
+
+# default.env / default.*.env file paths are allowed without confirmation
+DEFAULT_ENV_FILE_PATTERN = re.compile(r'default(\..*)?\.env$')
+
+# Bash command patterns that access .env files (but allow default*.env and .env.example)
+ENV_FILE_COMMAND_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r'(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # .env but not default*.env or .env.example
+        r'cat\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # cat .env
+        r'echo\s+.*>\s*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # echo > .env
+        r'touch\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # touch .env
+        r'cp\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # cp .env
+        r'mv\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # mv .env
+    )
+]
+
+# Single-pass scanner for all .env command patterns
+ENV_FILE_COMMAND_PATTERN = combine_patterns(ENV_FILE_COMMAND_PATTERNS)
+
 def classify_path(path: str) -> str:
     stripped = path.strip()
     lowered_path = stripped.lower()
@@ -329,10 +383,16 @@ def is_dangerous_git_command(command):
     Returns:
         bool: True if the command is dangerous and should be blocked, False otherwise
     """
-    normalized = ' '.join(command.lower().split())
+    lowered = command.lower()
+    # Every rule below needs the word "git", so most commands can return early
+    # with a substring check before any tokenizing or regex matching
+    if 'git' not in lowered:
+        return False
+
+    normalized = ' '.join(lowered.split())
     
     # Handle git push logic explicitly to allow --force-with-lease on non-protected branches
-    if re.search(r'\bgit\b', normalized) and re.search(r'\bpush\b', normalized):
+    if GIT_WORD_PATTERN.search(normalized) and PUSH_WORD_PATTERN.search(normalized):
         tokens = normalized.split()
         for i, token in enumerate(tokens):
             if token == 'push':
@@ -363,29 +423,7 @@ def is_dangerous_git_command(command):
                             if len(parts) > 1 and parts[-1] in protected_branches:
                                 return True
 
-    patterns = [
-        r'git\s+reset\s+--hard',  # git reset --hard
-        # git clean patterns - all variants with -f are destructive:
-        # -f alone removes untracked files
-        # -fx removes untracked + ignored files
-        # -fX removes only ignored files
-        # -fd/-df removes untracked files and directories
-        r'git\s+clean\s+-[a-z]*f[a-z]*d',  # git clean with f before d: -fd, -fxd, -fdx, etc.
-        r'git\s+clean\s+-[a-z]*d[a-z]*f',  # git clean with d before f: -df, -dxf, -dfx, -xdf, etc.
-        r'git\s+clean\s+-f[a-z]*(?:\s|$)',  # git clean -f/-fx/-fX: destructive even without -d
-        r'git\s+reflog\s+expire\s+--expire=now\s+--all',  # git reflog expire --expire=now --all
-        r'git\s+branch\s+-d\s+.*',  # git branch -d <branch>
-        r'git\s+branch\s+-D\s+.*',  # git branch -D <branch>
-        r'git\s+tag\s+-d\s+.*',  # git tag -d <tag>
-        r'git\s+remote\s+remove\s+.*',  # git remote remove <name>
-        r'git\s+filter-branch',  # git filter-branch
-        r'git\s+update-ref\s+-d',  # git update-ref -d
-        r'git\s+checkout\s+--orphan',  # git checkout --orphan
-    ]
-    for pattern in patterns:
-        if re.search(pattern, normalized):
-            return True
-    return False
+    return DANGEROUS_GIT_PATTERN.search(normalized) is not None
 
 def is_env_file_access(tool_name, tool_input):
     """
@@ -415,40 +453,31 @@ def is_env_file_access(tool_name, tool_input):
             # Ignore if file endswith .env.example
             if file_path.endswith('.env.example'):
                 return False
-            if '.env' in file_path and not re.search(r'default(\..*)?\.env$', file_path):
+            if '.env' in file_path and not DEFAULT_ENV_FILE_PATTERN.search(file_path):
                 return True
         
         # Check bash commands for .env file access
         elif tool_name == 'Bash':
             command = tool_input.get('command', '')
-            # Pattern to detect .env file access (but allow default*.env and .env.example)
-            env_patterns = [
-                r'(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # .env but not default*.env or .env.example
-                r'cat\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # cat .env
-                r'echo\s+.*>\s*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # echo > .env
-                r'touch\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # touch .env
-                r'cp\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # cp .env
-                r'mv\s+.*(?<!\w)\.env(?!\w)(?!default(\..*)?\.env)(?!\.example)',  # mv .env
-            ]
-            
-            for pattern in env_patterns:
-                if re.search(pattern, command):
-                    return True
+            # Every .env pattern contains the literal ".env", checked first
+            if '.env' in command and ENV_FILE_COMMAND_PATTERN.search(command):
+                return True
     
     return False
 
-def output_decision(decision, reason=None):
+def build_decision(decision, reason=None):
     """
-    Output a permission decision in the expected JSON format.
+    Build a permission decision payload in the expected JSON format.
 
-    This function formats and prints the permission decision that Claude Code
-    will use to determine whether to allow, deny, or ask about a tool usage.
+    This is the payload Claude Code uses to determine whether to allow, deny,
+    or ask about a tool usage.
 
     Args:
         decision (str): The permission decision - one of "allow", "deny", or "ask"
         reason (str, optional): Human-readable explanation for the decision
 
-    Output format (to stdout):
+    Returns:
+        dict: The payload, in this format:
         {
           "hookSpecificOutput": {
             "hookEventName": "PreToolUse",
@@ -467,14 +496,18 @@ def output_decision(decision, reason=None):
     if reason:
         payload["hookSpecificOutput"]["permissionDecisionReason"] = reason
 
-    print(json.dumps(payload))
+    return payload
 
-def output_permission_request_decision(behavior, updated_input=None, message=None, interrupt=False):
+def output_decision(decision, reason=None):
+    """Print the PreToolUse payload from build_decision() to stdout as JSON."""
+    print(json.dumps(build_decision(decision, reason)))
+
+def build_permission_request_decision(behavior, updated_input=None, message=None, interrupt=False):
     """
-    Output a PermissionRequest decision in the expected JSON format.
+    Build a PermissionRequest decision payload in the expected JSON format.
 
-    This function formats and prints the PermissionRequest decision that Claude Code
-    will use to determine whether to allow or deny a permission request shown to the user.
+    This is the payload Claude Code uses to determine whether to allow or deny
+    a permission request shown to the user.
 
     Args:
         behavior (str): The decision behavior - one of "allow" or "deny"
@@ -482,7 +515,8 @@ def output_permission_request_decision(behavior, updated_input=None, message=Non
         message (str, optional): For "deny" behavior, explanation for why permission was denied
         interrupt (bool, optional): For "deny" behavior, whether to stop Claude (default: False)
 
-    Output format (to stdout):
+    Returns:
+        dict: The payload, in this format:
         For "allow" behavior:
         {
           "hookSpecificOutput": {
@@ -516,18 +550,20 @@ def output_permission_request_decision(behavior, updated_input=None, message=Non
         if interrupt:
             decision["interrupt"] = interrupt
 
-    payload = {
+    return {
         "hookSpecificOutput": {
             "hookEventName": "PermissionRequest",
             "decision": decision,
         }
     }
 
-    print(json.dumps(payload))
+def output_permission_request_decision(behavior, updated_input=None, message=None, interrupt=False):
+    """Print the payload from build_permission_request_decision() to stdout as JSON."""
+    print(json.dumps(build_permission_request_decision(behavior, updated_input, message, interrupt)))
 
-def output_unified_decision(hook_event, decision_type, reason=None, updated_input=None, interrupt=False):
+def build_unified_decision(hook_event, decision_type, reason=None, updated_input=None, interrupt=False):
     """
-    Unified decision output that routes to the correct format based on hook event type.
+    Unified decision payload that routes to the correct format based on hook event type.
 
     Args:
         hook_event (str): The hook event type ("PreToolUse" or "PermissionRequest")
@@ -535,21 +571,34 @@ def output_unified_decision(hook_event, decision_type, reason=None, updated_inpu
         reason (str, optional): Reason for the decision
         updated_input (dict, optional): For PermissionRequest allow, modified tool input
         interrupt (bool, optional): For PermissionRequest deny, whether to stop Claude
+
+    Returns:
+        dict or None: The payload, or None when nothing should be output
     """
     if hook_event == 'PermissionRequest':
         # Map decision types to PermissionRequest behaviors
         if decision_type == 'deny':
-            output_permission_request_decision("deny", message=reason, interrupt=interrupt)
+            return build_permission_request_decision("deny", message=reason, interrupt=interrupt)
         elif decision_type == 'allow':
             # For 'ask', we allow and let the permission system handle the user prompt
-            output_permission_request_decision("allow", updated_input=updated_input)
+            return build_permission_request_decision("allow", updated_input=updated_input)
         else: # e.g: decision_type = 'ask'
             # PermissionRequest does not support 'ask' in output
-            # So to retain the same behavior, we simply exit with code 0
-            sys.exit(0)  # exit with code 0 (safe operation, no explicit action)
+            # So to retain the same behavior, no output is produced
+            return None
     else:
         # PreToolUse format
-        output_decision(decision_type, reason)
+        return build_decision(decision_type, reason)
+
+def output_unified_decision(hook_event, decision_type, reason=None, updated_input=None, interrupt=False):
+    """
+    Print the payload from build_unified_decision() to stdout as JSON.
+    Exits with code 0 and no output when there is no payload (safe operation, no explicit action).
+    """
+    payload = build_unified_decision(hook_event, decision_type, reason, updated_input, interrupt)
+    if payload is None:
+        sys.exit(0)  # exit with code 0 (safe operation, no explicit action)
+    print(json.dumps(payload))
 
 def load_settings_from_path(path):
     """Best-effort JSON loader that returns a dict or an empty default."""
@@ -567,6 +616,80 @@ def load_settings_from_path(path):
 
     return {}
 
+def evaluate_tool_usage(input_data, auto_allow=False):
+    """
+    Decide how the hook responds to a single tool usage.
+
+    Args:
+        input_data (dict): The hook input (hook_event_name, tool_name, tool_input)
+        auto_allow (bool): Explicitly allow safe operations (--and-auto-allow)
+
+    Returns:
+        dict or None: The hook output payload, or None when the hook should exit
+        with code 0 and no output, leaving the decision to the permission system.
+    """
+    # Detect the hook event type (defaults to PreToolUse for backwards compatibility)
+    hook_event = input_data.get('hook_event_name', 'PreToolUse')
+
+    tool_name = input_data.get('tool_name', '')
+    tool_input = input_data.get('tool_input', {})
+
+    # Validate that tool_input is a dictionary
+    if not isinstance(tool_input, dict):
+        return build_unified_decision(
+            hook_event,
+            "deny",
+            reason="Invalid tool_input format: expected a dictionary",
+            interrupt=True
+        )
+
+    # Check for .env file access (ask user for confirmation or auto-allow)
+    if is_env_file_access(tool_name, tool_input):
+        # If auto-allow is enabled, allow .env file access without asking
+        if auto_allow:
+            return build_unified_decision(hook_event, "allow")
+        return build_unified_decision(
+            hook_event,
+            "ask",
+            reason="This tool is attempting to access .env files which may contain sensitive data. Do you want to allow this access?"
+        )
+
+    # Check for dangerous rm -rf commands
+    if tool_name == 'Bash':
+        command = tool_input.get('command', '')
+
+        # Block rm -rf commands with comprehensive pattern matching
+        result_check =  is_dangerous_rm_command(command)
+        if result_check == 2:
+            return build_unified_decision(
+                hook_event,
+                "deny",
+                reason="Dangerous rm command detected and prevented.",
+                interrupt=True
+            )
+        elif result_check == 1:
+            return build_unified_decision(
+                hook_event,
+                "ask",
+                reason="Potentially Dangerous rm command detected. Do you want to run this command?"
+            )
+
+        # Block dangerous git commands with comprehensive pattern matching
+        if is_dangerous_git_command(command):
+            return build_unified_decision(
+                hook_event,
+                "deny",
+                reason="Dangerous git command detected and prevented.",
+                interrupt=True
+            )
+
+    # If auto-allow is set, explicitly allow safe operations
+    # This bypasses the permission system for safe operations
+    if auto_allow:
+        return build_unified_decision(hook_event, "allow")
+    # Otherwise, no output (safe operation, no explicit action)
+    return None
+
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(
@@ -602,75 +725,7 @@ def main():
         # Detect the hook event type (defaults to PreToolUse for backwards compatibility)
         hook_event = input_data.get('hook_event_name', 'PreToolUse')
 
-        tool_name = input_data.get('tool_name', '')
-        tool_input = input_data.get('tool_input', {})
-
-        # Validate that tool_input is a dictionary
-        if not isinstance(tool_input, dict):
-            output_unified_decision(
-                hook_event,
-                "deny",
-                reason="Invalid tool_input format: expected a dictionary",
-                interrupt=True
-            )
-            return
-
-        # Check for .env file access (ask user for confirmation or auto-allow)
-        if is_env_file_access(tool_name, tool_input):
-            # If auto-allow is enabled, allow .env file access without asking
-            if args.and_auto_allow:
-                output_unified_decision(hook_event, "allow")
-            else:
-                output_unified_decision(
-                    hook_event,
-                    "ask",
-                    reason="This tool is attempting to access .env files which may contain sensitive data. Do you want to allow this access?"
-                )
-            return
-
-        # Check for dangerous rm -rf commands
-        if tool_name == 'Bash':
-            command = tool_input.get('command', '')
-
-            # Block rm -rf commands with comprehensive pattern matching
-            result_check =  is_dangerous_rm_command(command)
-            if result_check == 2:
-                output_unified_decision(
-                    hook_event,
-                    "deny",
-                    reason="Dangerous rm command detected and prevented.",
-                    interrupt=True
-                )
-                return
-            elif result_check == 1:
-                output_unified_decision(
-                    hook_event,
-                    "ask",
-                    reason="Potentially Dangerous rm command detected. Do you want to run this command?"
-                )
-                return
-
-            # Block dangerous git commands with comprehensive pattern matching
-            if is_dangerous_git_command(command):
-                output_unified_decision(
-                    hook_event,
-                    "deny",
-                    reason="Dangerous git command detected and prevented.",
-                    interrupt=True
-                )
-                return
-
-        # If --and-auto-allow flag is set, explicitly allow safe operations
-        # This bypasses the permission system for safe operations
-        if args.and_auto_allow:
-            output_unified_decision(hook_event, "allow")
-        # Otherwise, exit with code 0 (safe operation, no explicit action)
-        # We use sys.exit(0) here to indicate successful completion with no output,
-        # which signals the permission system to pass through without intervention.
-        # This is intentional: returning would fall through to the exception handlers,
-        # while sys.exit(0) cleanly terminates with success status and no JSON output.
-        else:
-            sys.exit(0)
+        payload = evaluate_tool_usage(input_data, args.and_auto_allow)
 
     except json.JSONDecodeError as e:
         # Handle JSON decode errors - use detected event type or default to PreToolUse
@@ -681,6 +736,7 @@ def main():
             reason=f"Failed to parse JSON input: {e}",
             interrupt=True
         )
+        return
     except Exception as e:
         # Handle any other errors - use detected event type or default to PreToolUse
         event_type = hook_event if hook_event else 'PreToolUse'
@@ -690,6 +746,14 @@ def main():
             reason=f"Unexpected error occurred: {e}",
             interrupt=True
         )
+        return
+
+    # Exit with code 0 and no output when there is no explicit decision.
+    # This signals the permission system to pass through without intervention.
+    if payload is None:
+        sys.exit(0)
+
+    print(json.dumps(payload))
 
 if __name__ == '__main__':
     main()
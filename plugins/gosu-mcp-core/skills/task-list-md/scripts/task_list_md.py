@@ -5,10 +5,147 @@ import os
 import re
 import sys
 import time
-from dataclasses import dataclass
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Optional, Dict, Set
+from functools import lru_cache
+from typing import List, Optional, Dict, Iterable, Iterator, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the json module
+    orjson = None
+
+# Patterns used by the markdown task parser, compiled once at import time
+_TASK_LINE_RE = re.compile(r"^(\s*)-\s*(\[[ \-x\+\*]\])\s*(\d+(?:\.\d+)*)\.?\s*(.*)$")
+# _Requirements: ..._ and _Dependencies: ..._ metadata, matched in a single pass.
+# Values are bounded to a single line so a missing closing "_" fails fast
+_METADATA_RE = re.compile(r"_(Requirements|Dependencies):[^\S\n]*([^_\n]+)_")
+# Checkbox of a task line, replaced when a task status is written back
+_CHECKBOX_RE = re.compile(r"\[[ \-x\+\*]\]")
+# A whole task ID: digits with optional dot-separated hierarchy ("1", "1.2.3")
+_TASK_ID_RE = re.compile(r"\d+(?:\.\d+)*")
+# A whole duration argument: number with an optional s/m/h unit
+_DURATION_RE = re.compile(r"(\d+)([smh]?)")
+# Compiled "line of task <id>" patterns, keyed by task ID
+_TASK_ID_LINE_RES: Dict[str, "re.Pattern"] = {}
+# Numeric sort keys of task IDs, see _task_sort_key()
+_SORT_KEY_CACHE: Dict[str, tuple] = {}
+
+# Hook command searched for in the Claude transcript by infinite loop detection
+_HOOK_COMMAND_RE = re.compile(
+    rb"python3?\s+.*?task_list_md\.py\s+track-progress\s+check\s+.*?\s+--claude-hook"
+)
+# Only the tail of the transcript is scanned since it grows for the whole session
+_TRANSCRIPT_TAIL_BYTES = 64 * 1024
+
+
+def _task_id_line_re(task_id: str) -> "re.Pattern":
+    """Return the compiled pattern matching the task line of task_id"""
+    pattern = _TASK_ID_LINE_RES.get(task_id)
+    if pattern is None:
+        pattern = re.compile(rf"^\s*-\s*\[[ \-x\+\*]\]\s*{re.escape(task_id)}\.?\s*")
+        _TASK_ID_LINE_RES[task_id] = pattern
+    return pattern
+
+
+def _task_checkbox_index(line: str, task_id: str) -> int:
+    """Return the index of the checkbox if line is the task line of task_id, else -1
+
+    Matches the same lines as _task_id_line_re(task_id) using plain string checks.
+    """
+    index = line.find("[")
+    if (
+        index < 0
+        or line[:index].strip() != "-"
+        or line[index + 2 : index + 3] != "]"
+        or line[index + 1] not in " -x+*"
+        or not line[index + 3 :].lstrip().startswith(task_id)
+    ):
+        return -1
+    return index
+
+
+def _task_sort_key(task_id: str) -> tuple:
+    """Return the numeric sort key of a task ID ("1.10" -> (1, 10)), computed once per ID"""
+    sort_key = _SORT_KEY_CACHE.get(task_id)
+    if sort_key is None:
+        sort_key = tuple(int(part) for part in task_id.split("."))
+        _SORT_KEY_CACHE[task_id] = sort_key
+    return sort_key
+
+
+def _merge_ids(
+    current: List[str],
+    add: Optional[List[str]] = None,
+    remove: Optional[List[str]] = None,
+) -> List[str]:
+    """Return current with add appended (skipping IDs already present) and remove dropped
+
+    The order of current and add is kept; membership is checked with sets.
+    """
+    merged = list(current)
+    seen = set(merged)
+    for item in add or ():
+        if item not in seen:
+            seen.add(item)
+            merged.append(item)
+    if remove:
+        removed = set(remove)
+        merged = [item for item in merged if item not in removed]
+    return merged
+
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: str) -> str:
+    """Format an ISO timestamp for display, returning it unchanged if it cannot be parsed"""
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return timestamp
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _load_json_bytes(data: bytes):
+    """Parse JSON from raw bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dump_json_bytes(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _iter_json_object_bytes(
+    fields: dict, stream_key: str, stream_items: Iterable[Tuple[str, object]]
+) -> Iterator[bytes]:
+    """Yield _dump_json_bytes({**fields, stream_key: dict(stream_items)}) in chunks
+
+    Entries of the stream_key object are serialized one at a time as they are
+    produced, so the whole object never has to be held in memory.
+    """
+
+    def nested(value, depth: int) -> bytes:
+        # Re-indent a value serialized at the top level; strings never contain
+        # raw newlines, so every newline is indentation
+        return _dump_json_bytes(value).replace(b"\n", b"\n" + b"  " * depth)
+
+    yield b"{"
+    for key, value in fields.items():
+        yield b"\n  " + _dump_json_bytes(key) + b": " + nested(value, 1) + b","
+    yield b"\n  " + _dump_json_bytes(stream_key) + b": {"
+    separator = b"\n    "
+    for key, value in stream_items:
+        yield separator + _dump_json_bytes(key) + b": " + nested(value, 2)
+        separator = b",\n    "
+    # An empty object is written as {} like the single-shot serializers do
+    yield b"}\n}" if separator == b"\n    " else b"\n  }\n}"
 
 
 def parse_duration(duration_str: str) -> int:
@@ -34,7 +171,7 @@ def parse_duration(duration_str: str) -> int:
         raise ValueError("Duration string cannot be empty")
 
     # Extract number and unit
-    match = re.match(r"^(\d+)([smh]?)$", duration_str.strip())
+    match = _DURATION_RE.fullmatch(duration_str.strip())
     if not match:
         raise ValueError(
             f"Invalid duration format: '{duration_str}'. "
@@ -73,23 +210,18 @@ class Colors:
     RED = "\033[91m"
     WHITE = "\033[97m"
 
+    # Cached on first use: stdout does not change during a run
+    _colors_enabled: Optional[bool] = None
+
     @classmethod
     def get_status_color(cls, status: "TaskStatus") -> str:
         """Get the color code for a task status"""
-        color_map = {
-            TaskStatus.PENDING: cls.PENDING,
-            TaskStatus.IN_PROGRESS: cls.IN_PROGRESS,
-            TaskStatus.DONE: cls.DONE,
-            TaskStatus.REVIEW: cls.REVIEW,
-            TaskStatus.DEFERRED: cls.DEFERRED,
-        }
-        return color_map.get(status, cls.WHITE)
+        return _COLOR_BY_STATUS.get(status, cls.WHITE)
 
     @classmethod
     def colorize_status(cls, status: "TaskStatus") -> str:
         """Colorize a status string"""
-        color = cls.get_status_color(status)
-        return f"{color}{status.value}{cls.RESET}"
+        return _COLORED_STATUS[status]
 
     @classmethod
     def colorize_text(cls, text: str, color: str) -> str:
@@ -100,7 +232,9 @@ class Colors:
     def is_colors_enabled(cls) -> bool:
         """Check if terminal supports colors and colors should be enabled"""
         # Simple check - can be enhanced to check for terminal capabilities
-        return hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
+        if cls._colors_enabled is None:
+            cls._colors_enabled = hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
+        return cls._colors_enabled
 
 
 class TaskStatus(Enum):
@@ -113,25 +247,54 @@ class TaskStatus(Enum):
     @classmethod
     def from_checkbox(cls, checkbox: str) -> "TaskStatus":
         """Convert checkbox format to TaskStatus"""
-        mapping = {
-            "[ ]": cls.PENDING,
-            "[-]": cls.IN_PROGRESS,
-            "[x]": cls.DONE,
-            "[+]": cls.REVIEW,
-            "[*]": cls.DEFERRED,
-        }
-        return mapping.get(checkbox, cls.PENDING)
+        return _STATUS_BY_CHECKBOX.get(checkbox, cls.PENDING)
 
     def to_checkbox(self) -> str:
         """Convert TaskStatus to checkbox format"""
-        mapping = {
-            self.PENDING: "[ ]",
-            self.IN_PROGRESS: "[-]",
-            self.DONE: "[x]",
-            self.REVIEW: "[+]",
-            self.DEFERRED: "[*]",
-        }
-        return mapping[self]
+        return _CHECKBOX_BY_STATUS[self]
+
+
+# Checkbox markers used in the markdown file for each status
+_CHECKBOX_BY_STATUS = {
+    TaskStatus.PENDING: "[ ]",
+    TaskStatus.IN_PROGRESS: "[-]",
+    TaskStatus.DONE: "[x]",
+    TaskStatus.REVIEW: "[+]",
+    TaskStatus.DEFERRED: "[*]",
+}
+_STATUS_BY_CHECKBOX = {
+    checkbox: status for status, checkbox in _CHECKBOX_BY_STATUS.items()
+}
+
+# Terminal color for each status
+_COLOR_BY_STATUS = {
+    TaskStatus.PENDING: Colors.PENDING,
+    TaskStatus.IN_PROGRESS: Colors.IN_PROGRESS,
+    TaskStatus.DONE: Colors.DONE,
+    TaskStatus.REVIEW: Colors.REVIEW,
+    TaskStatus.DEFERRED: Colors.DEFERRED,
+}
+
+# Colored status strings, built once since there are only a handful of statuses
+_COLORED_STATUS = {
+    status: f"{color}{status.value}{Colors.RESET}"
+    for status, color in _COLOR_BY_STATUS.items()
+}
+
+
+# Keys of the per-file statistics stored in the progress data for each status
+_STATISTICS_KEY_BY_STATUS = {
+    TaskStatus.PENDING: "pending",
+    TaskStatus.IN_PROGRESS: "in_progress",
+    TaskStatus.DONE: "done",
+    TaskStatus.REVIEW: "review",
+    TaskStatus.DEFERRED: "deferred",
+}
+
+# Dependency statuses that let a dependent task start
+_SATISFIED_STATUSES = frozenset({TaskStatus.DONE, TaskStatus.REVIEW})
+# Parent statuses under which a pending sub-task cannot be started
+_BLOCKING_PARENT_STATUSES = frozenset({TaskStatus.PENDING, TaskStatus.DONE})
 
 
 @dataclass
@@ -144,6 +307,14 @@ class Task:
     line_number: int
     indent_level: int
     full_content: str
+    # Numeric form of task_id ("1.10" -> (1, 10)) used for hierarchical ordering
+    sort_key: tuple = field(init=False, repr=False, compare=False)
+    # Indentation used when listing the task, four spaces per hierarchy level
+    display_indent: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.sort_key = _task_sort_key(self.task_id)
+        self.display_indent = "    " * self.task_id.count(".")
 
     def __str__(self) -> str:
         if Colors.is_colors_enabled():
@@ -154,25 +325,64 @@ class Task:
 
 
 class ProgressTracker:
-    def __init__(self, progress_file: str = ".tasks.local.json"):
+    def __init__(
+        self,
+        progress_file: str = ".tasks.local.json",
+        history_file: Optional[str] = None,
+    ):
         self.progress_file = progress_file
+        # Status history is appended to a JSON Lines log next to the progress file
+        # (".tasks.local.json" -> ".tasks.local.history.jsonl") so a status change
+        # does not grow the JSON document that is rewritten on every save
+        if history_file is None:
+            base, ext = os.path.splitext(progress_file)
+            stem = base if ext == ".json" else progress_file
+            history_file = stem + ".history.jsonl"
+        self.history_file = history_file
         self.data = self._load_progress_data()
+        # History entries waiting to be appended on the next save
+        self._pending_history: List[Dict] = []
+        # Inside begin_batch()/end_batch() (which may nest), writes are deferred
+        # until the outermost end_batch()
+        self._batch_depth = 0
+        self._dirty = False
+        # Absolute paths keyed by the path given by the caller
+        self._abs_cache: Dict[str, str] = {}
+
+    def _abs(self, file_path: str) -> str:
+        """Return the absolute path for file_path, computing it once per path"""
+        abs_file_path = self._abs_cache.get(file_path)
+        if abs_file_path is None:
+            abs_file_path = os.path.abspath(file_path)
+            self._abs_cache[file_path] = abs_file_path
+        return abs_file_path
 
     def _load_progress_data(self) -> Dict:
         """Load progress data from JSON file"""
         if os.path.exists(self.progress_file):
             try:
-                with open(self.progress_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                with open(self.progress_file, "rb") as f:
+                    return _load_json_bytes(f.read())
             except (json.JSONDecodeError, FileNotFoundError):
                 return {}
         return {}
 
     def _save_progress_data(self):
         """Save progress data to JSON file"""
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
         try:
-            with open(self.progress_file, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            with open(self.progress_file, "wb") as f:
+                f.write(_dump_json_bytes(self.data))
+            if self._pending_history:
+                with open(self.history_file, "a", encoding="utf-8") as f:
+                    f.writelines(
+                        json.dumps(entry, ensure_ascii=False) + "\n"
+                        for entry in self._pending_history
+                    )
+                self._pending_history = []
         except OSError:
             print(f"Warning: Could not save progress data: filesystem error occurred")
         except PermissionError:
@@ -184,11 +394,29 @@ class ProgressTracker:
             logging.warning(f"Unexpected error saving progress: {e}")
             print(f"Warning: Could not save progress data: unexpected error")
 
+    def begin_batch(self):
+        """Defer saving progress data until the matching end_batch() is called"""
+        self._batch_depth += 1
+
+    def end_batch(self):
+        """Close a batch; the outermost one writes progress data once if anything changed"""
+        self._batch_depth -= 1
+        if not self._batch_depth and self._dirty:
+            self._save_progress_data()
+
     def update_task_status(
-        self, file_path: str, task_id: str, status: TaskStatus, description: str
+        self,
+        file_path: str,
+        task_id: str,
+        status: TaskStatus,
+        description: str,
+        now: Optional[str] = None,
     ):
-        """Update task status with timestamp"""
-        abs_file_path = os.path.abspath(file_path)
+        """Update task status with timestamp
+
+        now: ISO timestamp to record, so one operation can share a single instant
+        """
+        abs_file_path = self._abs(file_path)
 
         if abs_file_path not in self.data:
             self.data[abs_file_path] = {
@@ -206,18 +434,22 @@ class ProgressTracker:
 
         # Initialize task if not exists
         if task_id not in self.data[abs_file_path]["tasks"]:
-            self.data[abs_file_path]["tasks"][task_id] = {
-                "description": description,
-                "status_history": [],
-            }
+            self.data[abs_file_path]["tasks"][task_id] = {"description": description}
 
-        # Update description if it has changed
-        self.data[abs_file_path]["tasks"][task_id]["description"] = description
+        # Keep only the latest status in the progress file
+        timestamp = now or datetime.now().isoformat()
+        self.data[abs_file_path]["tasks"][task_id].update(
+            {"description": description, "status": status.value}
+        )
 
-        # Add status change to history
-        timestamp = datetime.now().isoformat()
-        self.data[abs_file_path]["tasks"][task_id]["status_history"].append(
-            {"status": status.value, "timestamp": timestamp}
+        # Queue the status change for the append-only history log
+        self._pending_history.append(
+            {
+                "file": abs_file_path,
+                "task": task_id,
+                "status": status.value,
+                "timestamp": timestamp,
+            }
         )
 
         # Update last modified timestamp
@@ -225,9 +457,49 @@ class ProgressTracker:
 
         self._save_progress_data()
 
-    def calculate_statistics(self, file_path: str, tasks: Dict[str, Task]):
+    def apply_status_delta(
+        self,
+        file_path: str,
+        task_id: str,
+        old_status: TaskStatus,
+        new_status: TaskStatus,
+        description: str,
+        now: Optional[str] = None,
+    ):
+        """Record a single task status change and update statistics incrementally
+
+        The statistics for file_path must already have been computed with
+        calculate_statistics; only the counters of the two statuses involved
+        are adjusted instead of recounting every task.
+        """
+        abs_file_path = self._abs(file_path)
+
+        self.begin_batch()
+        try:
+            self.update_task_status(file_path, task_id, new_status, description, now)
+
+            file_data = self.data[abs_file_path]
+            if old_status != new_status:
+                file_data[_STATISTICS_KEY_BY_STATUS[old_status]] -= 1
+                file_data[_STATISTICS_KEY_BY_STATUS[new_status]] += 1
+
+            total_tasks = file_data["total_tasks"]
+            completed_tasks = (
+                file_data["done"] + file_data["review"] + file_data["deferred"]
+            )
+            file_data["completed"] = completed_tasks
+            file_data["percentage"] = round(
+                (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2
+            )
+        finally:
+            self.end_batch()
+
+    def calculate_statistics(
+        self, file_path: str, tasks: Dict[str, Task], now: Optional[str] = None
+    ):
         """Calculate and update statistics for a file"""
-        abs_file_path = os.path.abspath(file_path)
+        abs_file_path = self._abs(file_path)
+        now = now or datetime.now().isoformat()
 
         if abs_file_path not in self.data:
             self.data[abs_file_path] = {
@@ -239,42 +511,34 @@ class ProgressTracker:
                 "review": 0,
                 "deferred": 0,
                 "percentage": 0.0,
-                "last_modified": datetime.now().isoformat(),
+                "last_modified": now,
                 "tasks": {},
             }
 
         # Count task statuses
-        status_counts = {
-            "pending": 0,
-            "in-progress": 0,
-            "done": 0,
-            "review": 0,
-            "deferred": 0,
-        }
-
-        for task in tasks.values():
-            status_counts[task.status.value] += 1
+        status_counts = Counter(task.status for task in tasks.values())
+        done = status_counts[TaskStatus.DONE]
+        review = status_counts[TaskStatus.REVIEW]
+        deferred = status_counts[TaskStatus.DEFERRED]
 
         # Update statistics
         total_tasks = len(tasks)
         # Consider done, review, and deferred as completion states
-        completed_tasks = (
-            status_counts["done"] + status_counts["review"] + status_counts["deferred"]
-        )
+        completed_tasks = done + review + deferred
 
         self.data[abs_file_path].update(
             {
                 "total_tasks": total_tasks,
                 "completed": completed_tasks,
-                "done": status_counts["done"],
-                "in_progress": status_counts["in-progress"],
-                "pending": status_counts["pending"],
-                "review": status_counts["review"],
-                "deferred": status_counts["deferred"],
+                "done": done,
+                "in_progress": status_counts[TaskStatus.IN_PROGRESS],
+                "pending": status_counts[TaskStatus.PENDING],
+                "review": review,
+                "deferred": deferred,
                 "percentage": round(
                     (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0, 2
                 ),
-                "last_modified": datetime.now().isoformat(),
+                "last_modified": now,
             }
         )
 
@@ -282,15 +546,42 @@ class ProgressTracker:
 
     def get_statistics(self, file_path: str) -> Dict:
         """Get statistics for a file"""
-        abs_file_path = os.path.abspath(file_path)
+        abs_file_path = self._abs(file_path)
         return self.data.get(abs_file_path, {})
 
+    def get_file_history(self, file_path: str) -> Dict[str, List[Dict]]:
+        """Get status history for every task of a file, keyed by task ID"""
+        abs_file_path = self._abs(file_path)
+        history = defaultdict(list)
+
+        # Entries recorded in the progress file by older versions
+        file_tasks = self.data.get(abs_file_path, {}).get("tasks", {})
+        for task_id, task_info in file_tasks.items():
+            history[task_id].extend(task_info.get("status_history", []))
+
+        entries = []
+        if os.path.exists(self.history_file):
+            try:
+                with open(self.history_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except OSError:
+                pass
+        entries.extend(self._pending_history)
+
+        for entry in entries:
+            if entry.get("file") == abs_file_path:
+                history[entry.get("task")].append(
+                    {"status": entry.get("status"), "timestamp": entry.get("timestamp")}
+                )
+        return dict(history)
+
     def get_task_history(self, file_path: str, task_id: str) -> List[Dict]:
         """Get status history for a specific task"""
-        abs_file_path = os.path.abspath(file_path)
-        if abs_file_path in self.data and task_id in self.data[abs_file_path]["tasks"]:
-            return self.data[abs_file_path]["tasks"][task_id]["status_history"]
-        return []
+        return self.get_file_history(file_path).get(task_id, [])
 
     def _parse_duration(self, duration_str: str) -> int:
         """Parse duration string to seconds. Supports h, m, s suffixes. No suffix defaults to seconds."""
@@ -334,7 +625,7 @@ class ProgressTracker:
         tasks: Dict[str, "Task"] = None,
     ):
         """Add a tracking condition with validation"""
-        abs_file_path = os.path.abspath(file_path)
+        abs_file_path = self._abs(file_path)
 
         # Validate task IDs exist
         if tasks:
@@ -348,7 +639,8 @@ class ProgressTracker:
         except ValueError as e:
             raise ValueError(f"Invalid duration format: '{valid_for}'. {e}")
 
-        valid_before = datetime.now() + timedelta(seconds=duration_seconds)
+        now = datetime.now()
+        valid_before = now + timedelta(seconds=duration_seconds)
 
         # Calculate expect_completed if complete_more is provided
         expect_completed = None
@@ -376,7 +668,7 @@ class ProgressTracker:
                 "review": 0,
                 "deferred": 0,
                 "percentage": 0.0,
-                "last_modified": datetime.now().isoformat(),
+                "last_modified": now.isoformat(),
                 "tasks": {},
                 "tracking": [],
             }
@@ -388,6 +680,8 @@ class ProgressTracker:
         # Create tracking condition
         condition = {
             "valid_before": valid_before.isoformat(),
+            # POSIX form of valid_before so expiry checks avoid parsing ISO strings
+            "valid_before_epoch": valid_before.timestamp(),
             "tasks_to_complete": task_ids.copy(),
         }
 
@@ -406,17 +700,24 @@ class ProgressTracker:
         self, file_path: str, tasks: Dict[str, "Task"]
     ) -> List[Dict]:
         """Check all completion conditions and return list of unmet conditions"""
-        abs_file_path = os.path.abspath(file_path)
+        abs_file_path = self._abs(file_path)
 
         if abs_file_path not in self.data or "tracking" not in self.data[abs_file_path]:
             return []
 
         unmet_conditions = []
-        current_time = datetime.now()
+        current_time = time.time()
+        # Statistics do not change while the conditions are checked
+        actual_count = self.data[abs_file_path].get("completed", 0)
 
         for condition in self.data[abs_file_path]["tracking"]:
-            # Skip expired conditions
-            valid_before = datetime.fromisoformat(condition["valid_before"])
+            # Skip expired conditions (conditions added by older versions only
+            # carry the ISO string)
+            valid_before = condition.get("valid_before_epoch")
+            if valid_before is None:
+                valid_before = datetime.fromisoformat(
+                    condition["valid_before"]
+                ).timestamp()
             if current_time > valid_before:
                 continue
 
@@ -440,8 +741,6 @@ class ProgressTracker:
             total_count_issue = None
             if "expect_completed" in condition:
                 expected_count = condition["expect_completed"]
-                current_stats = self.get_statistics(file_path)
-                actual_count = current_stats.get("completed", 0)
                 if actual_count < expected_count:
                     total_count_issue = f"Expected {expected_count} completed tasks, but only {actual_count} are completed"
 
@@ -458,7 +757,7 @@ class ProgressTracker:
 
     def clear_tracking_conditions(self, file_path: str, force: bool = False) -> bool:
         """Clear all tracking completion conditions. Returns True if cleared, False if cancelled."""
-        abs_file_path = os.path.abspath(file_path)
+        abs_file_path = self._abs(file_path)
 
         if abs_file_path not in self.data or "tracking" not in self.data[abs_file_path]:
             print("No completion conditions to clear.")
@@ -505,21 +804,26 @@ class ProgressTracker:
             # Expand tilde in path with validation
             # Its ok to trust this path since its coming from claude hook input
             expanded_path = os.path.expanduser(transcript_path)
-            if not os.path.exists(expanded_path):
+            try:
+                st = os.stat(expanded_path)
+            except FileNotFoundError:
                 return True  # If transcript doesn't exist, assume we should exit to be safe
 
-            # Corrected regex pattern to match the hook command
-            pattern = r"python3?\s+.*?task_list_md\.py\s+track-progress\s+check\s+.*?\s+--claude-hook"
-
+            loop_detected = False
             count = 0
-            with open(expanded_path, "r", encoding="utf-8") as f:
+            with open(expanded_path, "rb") as f:
+                # Only the most recent hook calls matter, so scan the tail of the file
+                if st.st_size > _TRANSCRIPT_TAIL_BYTES:
+                    f.seek(st.st_size - _TRANSCRIPT_TAIL_BYTES)
+                    f.readline()  # Discard the partial line at the seek position
                 for line in f:
-                    if re.search(pattern, line):
+                    if _HOOK_COMMAND_RE.search(line):
                         count += 1
                         if count > 3:
-                            return True
+                            loop_detected = True
+                            break
 
-            return False
+            return loop_detected
         except (IOError, OSError, PermissionError) as e:
             # Log the specific error for debugging
             print(
@@ -527,12 +831,6 @@ class ProgressTracker:
                 file=sys.stderr,
             )
             return True  # If we can't read the file, be safe and assume loop
-        except UnicodeDecodeError as e:
-            print(
-                f"Warning: Transcript file contains invalid characters: {e}",
-                file=sys.stderr,
-            )
-            return True
         except Exception as e:
             # Log unexpected errors for debugging
             import logging
@@ -579,20 +877,61 @@ class ProgressTracker:
 
 
 class TaskParser:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, keep_lines: bool = True):
         self.file_path = file_path
         self.tasks: Dict[str, Task] = {}
-        self.file_lines: List[str] = []
+        # keep_lines=False streams the file without holding its lines, for
+        # commands that only read tasks and never edit the file
+        self._keep_lines = keep_lines
+        self._file_lines: Optional[List[str]] = None
+        # Set when file_lines holds status changes not yet written to the file
+        self._file_dirty = False
+        # Task hierarchy index, rebuilt every time the file is parsed
+        self._parent_of: Dict[str, str] = {}
+        self._children_of: Dict[str, List[str]] = {}
+        # Tasks listing each task ID among their dependencies
+        self._dependents_of: Dict[str, List[str]] = {}
+        # Tasks listing each requirement ID among their requirements
+        self._tasks_requiring: Dict[str, List[str]] = {}
+        # Number of direct sub-tasks in each status, per parent task ID
+        self._child_status_counts: Dict[str, Counter] = {}
+        # Task IDs and their sort keys in hierarchical order, so the descendants
+        # of a task are a contiguous run right after it
+        self._sorted_ids: List[str] = []
+        self._sorted_keys: List[tuple] = []
+        # Task IDs in file order and their position in that list, used to find
+        # task boundaries without re-scanning the file lines
+        self._line_order: List[str] = []
+        self._line_position: Dict[str, int] = {}
         self.progress_tracker = ProgressTracker()
         self._parse_file()
         # Calculate initial statistics
         self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
 
+    @property
+    def file_lines(self) -> List[str]:
+        """Raw lines of the task file the tasks were parsed from
+
+        Parsers created with keep_lines=False load them on first use instead.
+        """
+        if self._file_lines is None:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._file_lines = f.readlines()
+        return self._file_lines
+
     def _parse_file(self):
         """Parse the markdown file and extract tasks"""
+        self._file_lines = None
         try:
             with open(self.file_path, "r", encoding="utf-8") as f:
-                self.file_lines = f.readlines()
+                if self._keep_lines:
+                    # Edits patch these same lines by task line number, so they
+                    # must be the lines the tasks were parsed from
+                    self._file_lines = f.readlines()
+                    self._parse_lines(self._file_lines)
+                else:
+                    # Stream the file instead of keeping every line in memory
+                    self._parse_lines(f)
         except FileNotFoundError:
             print(f"Error: File '{self.file_path}' not found.")
             sys.exit(1)
@@ -600,17 +939,55 @@ class TaskParser:
             print(f"Error reading file: {e}")
             sys.exit(1)
 
+        self._build_task_index()
+
+    def _build_task_index(self):
+        """Index parent/child relationships between the parsed tasks"""
+        self._parent_of = {}
+        self._children_of = defaultdict(list)
+        self._dependents_of = defaultdict(list)
+        self._tasks_requiring = defaultdict(list)
+        self._child_status_counts = defaultdict(Counter)
+        self._sorted_ids = []
+        self._sorted_keys = []
+        self._line_order = sorted(self.tasks, key=lambda t: self.tasks[t].line_number)
+        self._line_position = {
+            task_id: position for position, task_id in enumerate(self._line_order)
+        }
+        for task in sorted(self.tasks.values(), key=lambda t: t.sort_key):
+            task_id = task.task_id
+            self._sorted_ids.append(task_id)
+            self._sorted_keys.append(task.sort_key)
+            if "." in task_id:
+                parent_id = task_id.rsplit(".", 1)[0]
+                self._parent_of[task_id] = parent_id
+                self._children_of[parent_id].append(task_id)
+                self._child_status_counts[parent_id][task.status] += 1
+            for dep_id in task.dependencies:
+                dependents = self._dependents_of[dep_id]
+                # A dependency listed twice still makes the task one dependent
+                if not dependents or dependents[-1] != task_id:
+                    dependents.append(task_id)
+            for req_id in task.requirements:
+                holders = self._tasks_requiring[req_id]
+                if not holders or holders[-1] != task_id:
+                    holders.append(task_id)
+
+    def _parse_lines(self, lines, first_line_number: int = 1):
+        """Extract tasks from an iterable of markdown lines
+
+        first_line_number is the 1-based file line number of the first line, so a
+        slice of file_lines can be re-parsed on its own.
+        """
         current_task = None
         task_content_lines = []
 
-        for line_num, line in enumerate(self.file_lines, 1):
-            # remove newline from line
-            line = line.replace("\n", "")
+        for line_num, line in enumerate(lines, first_line_number):
+            # remove the trailing newline; only the end of the line needs checking
+            line = line.rstrip("\n")
             # Check if this is a task line
-            # Escape any user-controlled input to prevent regex injection
-            task_match = re.match(
-                r"^(\s*)-\s*(\[[ \-x\+\*]\])\s*(\d+(?:\.\d+)*)\.?\s*(.*)$", line
-            )
+            # Every task line has a checkbox, so skip the regex for lines without "["
+            task_match = _TASK_LINE_RE.match(line) if "[" in line else None
 
             if task_match:
                 # Save previous task if exists
@@ -641,35 +1018,72 @@ class TaskParser:
 
                 # If the current task doesn't have a description and this is a content line
                 # that contains text (not a sub-item, requirement, or dependency), use it as description
-                stripped_line = line.strip()
-                if (
-                    not current_task.description
-                    and stripped_line
-                    and not stripped_line.startswith("-")
-                    and not stripped_line.startswith("_Requirements:")
-                    and not stripped_line.startswith("_Dependencies:")
-                ):
-                    current_task.description = stripped_line
-
-                # Parse requirements
-                req_match = re.search(r"_Requirements:\s*([^_]+)_", line)
-                if req_match:
-                    req_text = req_match.group(1).strip()
-                    requirements = [req.strip() for req in req_text.split(",")]
-                    current_task.requirements.extend(requirements)
-
-                # Parse dependencies
-                dep_match = re.search(r"_Dependencies:\s*([^_]+)_", line)
-                if dep_match:
-                    dep_text = dep_match.group(1).strip()
-                    dependencies = [dep.strip() for dep in dep_text.split(",")]
-                    current_task.dependencies.extend(dependencies)
+                if not current_task.description:
+                    stripped_line = line.strip()
+                    if (
+                        stripped_line
+                        and not stripped_line.startswith("-")
+                        and not stripped_line.startswith("_Requirements:")
+                        and not stripped_line.startswith("_Dependencies:")
+                    ):
+                        current_task.description = stripped_line
+
+                # Parse requirements and dependencies
+                if "_Requirements:" in line or "_Dependencies:" in line:
+                    for meta_match in _METADATA_RE.finditer(line):
+                        kind, meta_text = meta_match.groups()
+                        values = [
+                            value.strip() for value in meta_text.strip().split(",")
+                        ]
+                        if kind == "Requirements":
+                            current_task.requirements.extend(values)
+                        else:
+                            current_task.dependencies.extend(values)
 
         # Don't forget the last task
         if current_task:
             current_task.full_content = "\n".join(task_content_lines)
             self.tasks[current_task.task_id] = current_task
 
+    def _refresh_tasks_after_edit(
+        self, edit_start: int, old_edit_end: int, new_edit_end: int
+    ):
+        """Update self.tasks after file_lines[edit_start:old_edit_end] was replaced
+
+        The replacement now spans file_lines[edit_start:new_edit_end]. Tasks after
+        the edit are shifted, and only the lines from the task preceding the edit
+        up to the next unchanged task line are re-parsed, which gives the same
+        tasks as parsing the whole file again. Call _build_task_index() afterwards.
+        """
+        delta = new_edit_end - old_edit_end
+        window_end = len(self.file_lines)
+        # The task before the edit is re-parsed as it may gain or lose content lines
+        preceding_task = None
+        stale_ids = []
+
+        for task_id, task in self.tasks.items():
+            index = task.line_number - 1
+            if index >= old_edit_end:
+                task.line_number += delta
+                window_end = min(window_end, index + delta)
+            elif index >= edit_start:
+                stale_ids.append(task_id)
+            elif (
+                preceding_task is None or task.line_number > preceding_task.line_number
+            ):
+                preceding_task = task
+
+        window_start = edit_start
+        if preceding_task is not None:
+            window_start = preceding_task.line_number - 1
+            stale_ids.append(preceding_task.task_id)
+
+        for task_id in stale_ids:
+            del self.tasks[task_id]
+        self._parse_lines(
+            self.file_lines[window_start:window_end], first_line_number=window_start + 1
+        )
+
     def _reload_tasks(self):
         """Reload tasks from the file (used during wait periods)"""
         # Clear existing tasks
@@ -687,8 +1101,7 @@ class TaskParser:
         """
         # First, check if all tasks are completed
         all_completed = all(
-            task.status in [TaskStatus.DONE, TaskStatus.REVIEW]
-            for task in self.tasks.values()
+            task.status in _SATISFIED_STATUSES for task in self.tasks.values()
         )
 
         if all_completed:
@@ -698,24 +1111,18 @@ class TaskParser:
         for task_id, task in self.tasks.items():
             if task.status == TaskStatus.PENDING:
                 # Check if all dependencies are satisfied
-                dependencies_satisfied = True
-                for dep_id in task.dependencies:
-                    if dep_id not in self.tasks:
-                        dependencies_satisfied = False
-                        break
-                    dep_task = self.tasks[dep_id]
-                    if dep_task.status not in [TaskStatus.DONE, TaskStatus.REVIEW]:
-                        dependencies_satisfied = False
-                        break
+                dependencies_satisfied = all(
+                    dep_id in self.tasks
+                    and self.tasks[dep_id].status in _SATISFIED_STATUSES
+                    for dep_id in task.dependencies
+                )
 
                 # For sub-tasks, also check if parent allows progression
-                if self._is_sub_task(task_id):
-                    parent_id = self._get_parent_task_id(task_id)
-                    if parent_id and parent_id in self.tasks:
-                        parent_task = self.tasks[parent_id]
-                        # Sub-task can only be worked on if parent is not pending or done
-                        if parent_task.status in [TaskStatus.PENDING, TaskStatus.DONE]:
-                            dependencies_satisfied = False
+                parent_task = self.tasks.get(self._parent_of.get(task_id))
+                if parent_task is not None:
+                    # Sub-task can only be worked on if parent is not pending or done
+                    if parent_task.status in _BLOCKING_PARENT_STATUSES:
+                        dependencies_satisfied = False
 
                 if dependencies_satisfied:
                     candidate_tasks.append((task_id, task))
@@ -732,29 +1139,26 @@ class TaskParser:
         Returns:
             Tuple of (task_id, task) for the highest priority task
         """
-        # Separate sub-tasks from parent tasks
-        sub_tasks = [
-            (tid, task) for tid, task in candidate_tasks if self._is_sub_task(tid)
-        ]
-
-        # Prefer sub-tasks if their parent is in-progress
-        preferred_tasks = []
-        for tid, task in sub_tasks:
-            parent_id = self._get_parent_task_id(tid)
+        # Track the lowest-ordered candidate overall and the lowest-ordered
+        # sub-task whose parent is in-progress in a single pass
+        best = None
+        best_preferred = None
+        for tid, task in candidate_tasks:
+            if best is None or task.sort_key < best[1].sort_key:
+                best = (tid, task)
+
+            parent_id = self._parent_of.get(tid)
             if (
-                parent_id
-                and parent_id in self.tasks
+                parent_id in self.tasks
                 and self.tasks[parent_id].status == TaskStatus.IN_PROGRESS
+                and (
+                    best_preferred is None or task.sort_key < best_preferred[1].sort_key
+                )
             ):
-                preferred_tasks.append((tid, task))
+                best_preferred = (tid, task)
 
-        # If we have preferred sub-tasks, use them; otherwise use all candidates
-        if preferred_tasks:
-            candidate_tasks = preferred_tasks
-
-        # Sort by task ID to get the first one
-        candidate_tasks.sort(key=lambda x: self._sort_key(x[0]))
-        return candidate_tasks[0]
+        # Prefer sub-tasks of an in-progress parent; otherwise use all candidates
+        return best_preferred or best
 
     def _display_next_task(self, task_id, task):
         """
@@ -765,7 +1169,8 @@ class TaskParser:
             task: The Task object
         """
         # Use colored status
-        if Colors.is_colors_enabled():
+        use_colors = Colors.is_colors_enabled()
+        if use_colors:
             colored_status = Colors.colorize_status(task.status)
         else:
             colored_status = task.status.value
@@ -782,7 +1187,7 @@ class TaskParser:
             print(f"\nSub-tasks:")
             for sub_id in sub_task_ids:
                 sub_task = self.tasks[sub_id]
-                if Colors.is_colors_enabled():
+                if use_colors:
                     sub_colored_status = Colors.colorize_status(sub_task.status)
                 else:
                     sub_colored_status = sub_task.status.value
@@ -793,7 +1198,7 @@ class TaskParser:
             parent_id = self._get_parent_task_id(task_id)
             if parent_id and parent_id in self.tasks:
                 parent_task = self.tasks[parent_id]
-                if Colors.is_colors_enabled():
+                if use_colors:
                     parent_colored_status = Colors.colorize_status(parent_task.status)
                 else:
                     parent_colored_status = parent_task.status.value
@@ -811,13 +1216,12 @@ class TaskParser:
         print(f"Tasks from {self.file_path}:")
         print("-" * 60)
 
-        # Sort tasks by ID (numeric sort for hierarchical IDs)
-        sorted_task_ids = sorted(self.tasks.keys(), key=self._sort_key)
+        # The index keeps task IDs in hierarchical order
+        self._write_task_lines(self.tasks[task_id] for task_id in self._sorted_ids)
 
-        for task_id in sorted_task_ids:
-            task = self.tasks[task_id]
-            indent = "    " * (task.task_id.count("."))
-            print(f"{indent}{task}")
+    def _write_task_lines(self, tasks):
+        """Write one indented line per task with a single stdout write"""
+        sys.stdout.write("".join(f"{task.display_indent}{task}\n" for task in tasks))
 
     def show_task(self, task_id: str):
         """Show details of a specific task"""
@@ -828,7 +1232,8 @@ class TaskParser:
         task = self.tasks[task_id]
 
         # Use colored status
-        if Colors.is_colors_enabled():
+        use_colors = Colors.is_colors_enabled()
+        if use_colors:
             colored_status = Colors.colorize_status(task.status)
         else:
             colored_status = task.status.value
@@ -849,7 +1254,7 @@ class TaskParser:
             print(f"Sub-tasks ({len(sub_task_ids)}):")
             for sub_id in sub_task_ids:
                 sub_task = self.tasks[sub_id]
-                if Colors.is_colors_enabled():
+                if use_colors:
                     sub_colored_status = Colors.colorize_status(sub_task.status)
                 else:
                     sub_colored_status = sub_task.status.value
@@ -860,7 +1265,7 @@ class TaskParser:
             parent_id = self._get_parent_task_id(task_id)
             if parent_id and parent_id in self.tasks:
                 parent_task = self.tasks[parent_id]
-                if Colors.is_colors_enabled():
+                if use_colors:
                     parent_colored_status = Colors.colorize_status(parent_task.status)
                 else:
                     parent_colored_status = parent_task.status.value
@@ -902,7 +1307,7 @@ class TaskParser:
                 if (
                     old_status == TaskStatus.PENDING
                     and new_status != TaskStatus.PENDING
-                    and parent_task.status in [TaskStatus.PENDING, TaskStatus.DONE]
+                    and parent_task.status in _BLOCKING_PARENT_STATUSES
                 ):
                     print(
                         f"Error: Cannot change sub-task '{task_id}' from pending to '{new_status.value}' "
@@ -912,17 +1317,15 @@ class TaskParser:
                     return
 
         # Update the task status
-        task.status = new_status
+        self._set_task_status(task, new_status)
         self._update_file_status(task)
 
-        # Record the status change in progress tracker
-        self.progress_tracker.update_task_status(
-            self.file_path, task_id, new_status, task.description
+        # Record the status change and update statistics for this one task
+        now = datetime.now().isoformat()
+        self.progress_tracker.apply_status_delta(
+            self.file_path, task_id, old_status, new_status, task.description, now
         )
 
-        # Recalculate statistics
-        self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
-
         if Colors.is_colors_enabled():
             colored_old = Colors.colorize_status(old_status)
             colored_new = Colors.colorize_status(new_status)
@@ -940,6 +1343,8 @@ class TaskParser:
             if parent_id:
                 self._auto_update_parent_status(parent_id)
 
+        self._flush_file()
+
     def get_next_task(self, wait_duration: Optional[int] = None):
         """
         Get the next task ID to work on, considering both parent tasks and sub-tasks.
@@ -1031,6 +1436,70 @@ class TaskParser:
         # Display the next task with context
         self._display_next_task(next_task_id, next_task)
 
+    def _is_dependent_of(self, task_id: str, other_id: str) -> bool:
+        """Check whether task_id depends on other_id, directly or transitively"""
+        stack = [other_id]
+        visited = {other_id}
+        while stack:
+            for dependent_id in self._dependents_of.get(stack.pop(), ()):
+                if dependent_id == task_id:
+                    return True
+                if dependent_id not in visited:
+                    visited.add(dependent_id)
+                    stack.append(dependent_id)
+        return False
+
+    def _find_dependency_cycles(self) -> List[List[str]]:
+        """Find groups of tasks that depend on each other (strongly connected components)
+
+        Uses an iterative version of Tarjan's algorithm. Only groups with more
+        than one task are returned, each sorted by task ID.
+        """
+        index_of: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        cycles = []
+
+        for root_id in self._sorted_ids:
+            if root_id in index_of:
+                continue
+            # Each frame is (task ID, iterator over its existing dependencies)
+            work = [(root_id, iter(self.tasks[root_id].dependencies))]
+            index_of[root_id] = lowlink[root_id] = len(index_of)
+            stack.append(root_id)
+            on_stack.add(root_id)
+            while work:
+                task_id, deps = work[-1]
+                for dep_id in deps:
+                    if dep_id not in self.tasks:
+                        continue
+                    if dep_id not in index_of:
+                        index_of[dep_id] = lowlink[dep_id] = len(index_of)
+                        stack.append(dep_id)
+                        on_stack.add(dep_id)
+                        work.append((dep_id, iter(self.tasks[dep_id].dependencies)))
+                        break
+                    if dep_id in on_stack:
+                        lowlink[task_id] = min(lowlink[task_id], index_of[dep_id])
+                else:
+                    work.pop()
+                    if work:
+                        parent_id = work[-1][0]
+                        lowlink[parent_id] = min(lowlink[parent_id], lowlink[task_id])
+                    if lowlink[task_id] == index_of[task_id]:
+                        component = []
+                        while True:
+                            member_id = stack.pop()
+                            on_stack.discard(member_id)
+                            component.append(member_id)
+                            if member_id == task_id:
+                                break
+                        if len(component) > 1:
+                            cycles.append(sorted(component, key=self._sort_key))
+
+        return cycles
+
     def validate_dependencies(self):
         """Validate all task dependencies"""
         errors = []
@@ -1056,6 +1525,12 @@ class TaskParser:
                         f"Circular dependency between tasks '{task_id}' and '{dep_id}'"
                     )
 
+        # Longer cycles: groups of three or more tasks that depend on each other
+        for cycle in self._find_dependency_cycles():
+            if len(cycle) > 2:
+                cycle_ids = ", ".join(f"'{tid}'" for tid in cycle)
+                errors.append(f"Circular dependency among tasks {cycle_ids}")
+
         if errors:
             print("Dependency validation errors found:")
             for error in errors:
@@ -1074,69 +1549,86 @@ class TaskParser:
             print("No progress data available for this file.")
             return
 
-        print(f"Progress Report for: {self.file_path}")
-        print("=" * 60)
-        print(f"Total Tasks: {stats.get('total_tasks', 0)}")
-        print(f"Completed (done+review+deferred): {stats.get('completed', 0)}")
-        print(f"  Done: {stats.get('done', 0)}")
-        print(f"  Review: {stats.get('review', 0)}")
-        print(f"  Deferred: {stats.get('deferred', 0)}")
-        print(f"In Progress: {stats.get('in_progress', 0)}")
-        print(f"Pending: {stats.get('pending', 0)}")
-        print(f"Completion Percentage: {stats.get('percentage', 0)}%")
-        print(f"Last Modified: {stats.get('last_modified', 'Unknown')}")
-        print()
+        # Build the report in memory and write it once; history dumps can be long
+        get = stats.get
+        out = [
+            f"Progress Report for: {self.file_path}",
+            "=" * 60,
+            f"Total Tasks: {get('total_tasks', 0)}",
+            f"Completed (done+review+deferred): {get('completed', 0)}",
+            f"  Done: {get('done', 0)}",
+            f"  Review: {get('review', 0)}",
+            f"  Deferred: {get('deferred', 0)}",
+            f"In Progress: {get('in_progress', 0)}",
+            f"Pending: {get('pending', 0)}",
+            f"Completion Percentage: {get('percentage', 0)}%",
+            f"Last Modified: {get('last_modified', 'Unknown')}",
+            "",
+        ]
 
         # Show task history if available
-        task_data = stats.get("tasks", {})
+        task_data = get("tasks", {})
         if task_data:
-            print("Task Status History:")
-            print("-" * 40)
+            out.append("Task Status History:")
+            out.append("-" * 40)
 
             # Sort task IDs for consistent display
             sorted_task_ids = sorted(task_data.keys(), key=self._sort_key)
+            file_history = self.progress_tracker.get_file_history(self.file_path)
 
             for task_id in sorted_task_ids:
                 task_info = task_data[task_id]
-                print(
+                out.append(
                     f"\nTask {task_id}: {task_info.get('description', 'No description')}"
                 )
 
-                history = task_info.get("status_history", [])
+                history = file_history.get(task_id, [])
                 if history:
-                    print("  Status History:")
-                    for entry in history:
-                        timestamp = entry.get("timestamp", "Unknown")
-                        status = entry.get("status", "Unknown")
-                        # Format timestamp for better readability
-                        try:
-                            dt = datetime.fromisoformat(
-                                timestamp.replace("Z", "+00:00")
-                            )
-                            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-                        except:
-                            formatted_time = timestamp
-                        print(f"    {formatted_time}: {status}")
+                    out.append("  Status History:")
+                    # Format timestamps for better readability
+                    out.extend(
+                        f"    {_format_timestamp(entry.get('timestamp', 'Unknown'))}: "
+                        f"{entry.get('status', 'Unknown')}"
+                        for entry in history
+                    )
                 else:
-                    print("  No status history available")
+                    out.append("  No status history available")
         else:
-            print("No detailed task history available.")
+            out.append("No detailed task history available.")
+
+        out.append("")
+        sys.stdout.write("\n".join(out))
+
+    def _write_file(self):
+        """Write file_lines back to the task file"""
+        # Join before opening so the file is truncated for as short a time as possible
+        content = "".join(self.file_lines)
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        self._file_dirty = False
+
+    def _flush_file(self):
+        """Write pending status changes to the task file, once per command"""
+        if not self._file_dirty:
+            return
+        try:
+            self._write_file()
+        except Exception as e:
+            print(f"Error updating file: {e}")
 
     def _update_file_status(self, task: Task):
-        """Update the task status in the file"""
+        """Update the task status in file_lines; written by _flush_file()"""
         try:
             # Use the known line number instead of searching through all lines
             line_index = task.line_number - 1
             if 0 <= line_index < len(self.file_lines):
                 line = self.file_lines[line_index]
-                # Verify this is the correct task line before updating
-                if re.match(
-                    rf"^\s*-\s*\[[ \-x\+\*]\]\s*{re.escape(task.task_id)}\.?\s*", line
-                ):
-                    updated_line = re.sub(
-                        r"\[[ \-x\+\*]\]", task.status.to_checkbox(), line
+                # Verify this is the correct task line and patch its checkbox
+                index = _task_checkbox_index(line, task.task_id)
+                if index >= 0:
+                    self.file_lines[line_index] = (
+                        line[:index] + task.status.to_checkbox() + line[index + 3 :]
                     )
-                    self.file_lines[line_index] = updated_line
                 else:
                     # Fallback to search if line number doesn't match
                     self._search_and_update_task_line(task)
@@ -1144,9 +1636,7 @@ class TaskParser:
                 # Fallback to search if line number is out of range
                 self._search_and_update_task_line(task)
 
-            # Write the updated content back to the file
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                f.writelines(self.file_lines)
+            self._file_dirty = True
 
         except Exception as e:
             print(f"Error updating file: {e}")
@@ -1154,23 +1644,20 @@ class TaskParser:
     def _search_and_update_task_line(self, task: Task):
         """Fallback method to search for task line when line number doesn't match"""
         # Find the line with the task and update its checkbox
+        task_line_re = _task_id_line_re(task.task_id)
         for i, line in enumerate(self.file_lines):
-            if re.match(
-                rf"^\s*-\s*\[[ \-x\+\*]\]\s*{re.escape(task.task_id)}\.?\s*",
-                line.strip(),
-            ):
+            if task_line_re.match(line.strip()):
                 # Replace the checkbox in the line
-                updated_line = re.sub(
-                    r"\[[ \-x\+\*]\]", task.status.to_checkbox(), line
+                updated_line = _CHECKBOX_RE.sub(
+                    task.status.to_checkbox(), line, count=1
                 )
                 self.file_lines[i] = updated_line
                 break
 
-    def _sort_key(self, task_id: str):
+    def _sort_key(self, task_id: str) -> tuple:
         """Create a sort key for hierarchical task IDs"""
-        # Convert "1.2.3" to [1, 2, 3] for proper numeric sorting
-        parts = task_id.split(".")
-        return [int(part) for part in parts]
+        # "1.2.3" -> (1, 2, 3) for proper numeric sorting
+        return _task_sort_key(task_id)
 
     def _is_sub_task(self, task_id: str) -> bool:
         """Check if this is a sub-task (contains dots)"""
@@ -1178,52 +1665,48 @@ class TaskParser:
 
     def _get_parent_task_id(self, task_id: str) -> Optional[str]:
         """Get the parent task ID for a sub-task"""
-        if not self._is_sub_task(task_id):
-            return None
-        parts = task_id.split(".")
-        return ".".join(parts[:-1])
+        parent_id = self._parent_of.get(task_id)
+        if parent_id is None and self._is_sub_task(task_id):
+            # Task IDs that are not in the file yet (e.g. a task being added)
+            parent_id = task_id.rsplit(".", 1)[0]
+        return parent_id
 
     def _has_sub_tasks(self, task_id: str) -> bool:
         """Check if this task has sub-tasks"""
-        for tid in self.tasks.keys():
-            if (
-                tid.startswith(task_id + ".")
-                and tid.count(".") == task_id.count(".") + 1
-            ):
-                return True
-        return False
+        return bool(self._children_of.get(task_id))
 
     def _get_sub_tasks(self, task_id: str) -> List[str]:
         """Get direct sub-tasks of a given task"""
-        sub_tasks = []
-        for tid in self.tasks.keys():
-            if (
-                tid.startswith(task_id + ".")
-                and tid.count(".") == task_id.count(".") + 1
-            ):
-                sub_tasks.append(tid)
-        return sorted(sub_tasks, key=self._sort_key)
+        return list(self._children_of.get(task_id, ()))
+
+    def _set_task_status(self, task: Task, new_status: TaskStatus):
+        """Change a task's status, keeping its parent's sub-task status counts current"""
+        parent_id = self._parent_of.get(task.task_id)
+        if parent_id is not None:
+            counts = self._child_status_counts[parent_id]
+            counts[task.status] -= 1
+            if counts[task.status] <= 0:
+                del counts[task.status]
+            counts[new_status] += 1
+        task.status = new_status
 
     def _auto_update_parent_status(self, parent_id: str):
         """Auto-update parent task status if all sub-tasks have the same status"""
         if parent_id not in self.tasks:
             return
 
-        sub_task_ids = self._get_sub_tasks(parent_id)
-        if not sub_task_ids:
+        status_counts = self._child_status_counts.get(parent_id)
+        if not status_counts:
             return
 
-        # Get all sub-task statuses
-        sub_statuses = [self.tasks[sub_id].status for sub_id in sub_task_ids]
-
         # If all sub-tasks have the same status, update parent
-        if len(set(sub_statuses)) == 1:  # All statuses are the same
-            new_status = sub_statuses[0]
+        if len(status_counts) == 1:  # All statuses are the same
+            new_status = next(iter(status_counts))
             parent_task = self.tasks[parent_id]
 
             if parent_task.status != new_status:
                 old_status = parent_task.status
-                parent_task.status = new_status
+                self._set_task_status(parent_task, new_status)
                 self._update_file_status(parent_task)
                 if Colors.is_colors_enabled():
                     colored_old = Colors.colorize_status(old_status)
@@ -1311,16 +1794,17 @@ class TaskParser:
             new_lines.append("\n")
 
         # Insert all the new lines
-        for i, line in enumerate(new_lines):
-            self.file_lines.insert(insert_position + i, line)
+        self.file_lines[insert_position:insert_position] = new_lines
 
         # Write the updated content back to the file
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                f.writelines(self.file_lines)
+            self._write_file()
 
-            # Re-parse the file to update the tasks dictionary
-            self._parse_file()
+            # Re-parse only the lines around the new task
+            self._refresh_tasks_after_edit(
+                insert_position, insert_position, insert_position + len(new_lines)
+            )
+            self._build_task_index()
             self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
 
             print(f"Added task '{task_id}': {description}")
@@ -1370,7 +1854,7 @@ class TaskParser:
                     print(f"Error: Task '{task_id}' cannot depend on itself.")
                     sys.exit(1)
                 # Check if adding this dependency would create a circular dependency
-                if task_id in self.tasks[dep_id].dependencies:
+                if self._is_dependent_of(dep_id, task_id):
                     print(
                         f"Error: Adding dependency '{dep_id}' would create a circular dependency."
                     )
@@ -1402,36 +1886,21 @@ class TaskParser:
         if clear_dependencies:
             task.dependencies = []
         else:
-            if add_dependencies:
-                for dep_id in add_dependencies:
-                    if dep_id not in task.dependencies:
-                        task.dependencies.append(dep_id)
-
-            if remove_dependencies:
-                for dep_id in remove_dependencies:
-                    if dep_id in task.dependencies:
-                        task.dependencies.remove(dep_id)
+            task.dependencies = _merge_ids(
+                task.dependencies, add_dependencies, remove_dependencies
+            )
 
         # Update requirements
         if clear_requirements:
             task.requirements = []
         else:
-            if add_requirements:
-                for req_id in add_requirements:
-                    if req_id not in task.requirements:
-                        task.requirements.append(req_id)
-
-            if remove_requirements:
-                for req_id in remove_requirements:
-                    if req_id in task.requirements:
-                        task.requirements.remove(req_id)
+            task.requirements = _merge_ids(
+                task.requirements, add_requirements, remove_requirements
+            )
 
         # Update the file content
         try:
             self._update_task_in_file(task)
-
-            # Re-parse the file to update the tasks dictionary
-            self._parse_file()
             self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
 
             # Report changes
@@ -1483,18 +1952,16 @@ class TaskParser:
             new_task_lines.append(f"{indent_str}_Dependencies: {dep_text}_\n")
 
         # Replace the old task content with new content
-        # Remove old lines
-        for i in range(task_end_line - 1, task_start_line - 1, -1):
-            if i < len(self.file_lines):
-                del self.file_lines[i]
-
-        # Insert new lines
-        for i, line in enumerate(new_task_lines):
-            self.file_lines.insert(task_start_line + i, line)
+        self.file_lines[task_start_line:task_end_line] = new_task_lines
 
         # Write the updated content back to the file
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            f.writelines(self.file_lines)
+        self._write_file()
+
+        # Re-parse only the lines around the rewritten task
+        self._refresh_tasks_after_edit(
+            task_start_line, task_end_line, task_start_line + len(new_task_lines)
+        )
+        self._build_task_index()
 
     def delete_task(self, task_ids: List[str]):
         """Delete one or more tasks and handle dependency cleanup"""
@@ -1505,10 +1972,11 @@ class TaskParser:
                 return
 
         # Check for dependent tasks that would be broken
+        task_ids_set = set(task_ids)
         dependent_tasks = []
         for task_id in task_ids:
-            for tid, task in self.tasks.items():
-                if tid not in task_ids and task_id in task.dependencies:
+            for tid in self._dependents_of.get(task_id, ()):
+                if tid not in task_ids_set:
                     dependent_tasks.append((tid, task_id))
 
         if dependent_tasks:
@@ -1540,19 +2008,26 @@ class TaskParser:
                     for line_idx in range(sub_start, sub_end):
                         lines_to_delete.add(line_idx)
 
-        # Remove lines in reverse order to maintain indices
-        sorted_lines = sorted(lines_to_delete, reverse=True)
-        for line_idx in sorted_lines:
-            if 0 <= line_idx < len(self.file_lines):
-                del self.file_lines[line_idx]
+        # Group the lines into contiguous ranges
+        ranges = []
+        for line_idx in sorted(lines_to_delete):
+            if not 0 <= line_idx < len(self.file_lines):
+                continue
+            if ranges and ranges[-1][1] == line_idx:
+                ranges[-1][1] = line_idx + 1
+            else:
+                ranges.append([line_idx, line_idx + 1])
+
+        # Remove ranges in reverse order to maintain indices, dropping the
+        # deleted tasks and shifting the ones after each range
+        for start, end in reversed(ranges):
+            del self.file_lines[start:end]
+            self._refresh_tasks_after_edit(start, end, start)
+        self._build_task_index()
 
         # Write the updated content back to the file
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                f.writelines(self.file_lines)
-
-            # Re-parse the file to update the tasks dictionary
-            self._parse_file()
+            self._write_file()
             self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
 
             deleted_names = [f"'{task_id}'" for task_id in task_ids]
@@ -1579,21 +2054,23 @@ class TaskParser:
                 print(f"Error: Task '{task_id}' not found.")
                 return
 
-        # Set status for each task
+        # Set status for each task, saving progress data once at the end
         updated_tasks = []
-        for task_id in task_ids:
-            task = self.tasks[task_id]
-            old_status = task.status
+        now = datetime.now().isoformat()
+        self.progress_tracker.begin_batch()
+        try:
+            for task_id in task_ids:
+                task = self.tasks[task_id]
+                old_status = task.status
 
-            # Validate sub-task status change against parent (same logic as single set_status)
-            if self._is_sub_task(task_id):
-                parent_id = self._get_parent_task_id(task_id)
-                if parent_id and parent_id in self.tasks:
-                    parent_task = self.tasks[parent_id]
+                # Validate sub-task status change against parent (same logic as single set_status)
+                parent_id = self._parent_of.get(task_id)
+                parent_task = self.tasks.get(parent_id)
+                if parent_task is not None:
                     if (
                         old_status == TaskStatus.PENDING
                         and new_status != TaskStatus.PENDING
-                        and parent_task.status in [TaskStatus.PENDING, TaskStatus.DONE]
+                        and parent_task.status in _BLOCKING_PARENT_STATUSES
                     ):
                         print(
                             f"Warning: Skipping task '{task_id}' - cannot change from pending to '{new_status.value}' "
@@ -1601,41 +2078,48 @@ class TaskParser:
                         )
                         continue
 
-            # Update the task status
-            task.status = new_status
-            self._update_file_status(task)
-
-            # Record the status change in progress tracker
-            self.progress_tracker.update_task_status(
-                self.file_path, task_id, new_status, task.description
-            )
-
-            updated_tasks.append((task_id, old_status, new_status))
+                # Update the task status
+                self._set_task_status(task, new_status)
+                self._update_file_status(task)
+
+                # Record the status change and adjust the statistics for this task
+                self.progress_tracker.apply_status_delta(
+                    self.file_path,
+                    task_id,
+                    old_status,
+                    new_status,
+                    task.description,
+                    now,
+                )
 
-        # Recalculate statistics
-        self.progress_tracker.calculate_statistics(self.file_path, self.tasks)
+                updated_tasks.append((task_id, old_status, new_status))
+        finally:
+            self.progress_tracker.end_batch()
 
         # Auto-update parent tasks for all updated sub-tasks
         parent_tasks_to_check = set()
         for task_id, _, _ in updated_tasks:
-            if self._is_sub_task(task_id):
-                parent_id = self._get_parent_task_id(task_id)
-                if parent_id:
-                    parent_tasks_to_check.add(parent_id)
+            parent_id = self._parent_of.get(task_id)
+            if parent_id:
+                parent_tasks_to_check.add(parent_id)
 
         # Check and update parent tasks
         for parent_id in parent_tasks_to_check:
             self._auto_update_parent_status(parent_id)
 
+        # Write every status change to the file at once
+        self._flush_file()
+
         # Report results
         if updated_tasks:
-            if Colors.is_colors_enabled():
+            use_colors = Colors.is_colors_enabled()
+            if use_colors:
                 colored_new_status = Colors.colorize_status(new_status)
             else:
                 colored_new_status = new_status.value
             print(f"Updated {len(updated_tasks)} task(s) to {colored_new_status}:")
             for task_id, old_status, new_status in updated_tasks:
-                if Colors.is_colors_enabled():
+                if use_colors:
                     colored_old = Colors.colorize_status(old_status)
                     colored_new = Colors.colorize_status(new_status)
                     print(f"  '{task_id}': {colored_old} -> {colored_new}")
@@ -1651,18 +2135,17 @@ class TaskParser:
             last_root_position = 0
             target_id = int(task_id)
 
-            for i, line in enumerate(self.file_lines):
-                task_match = re.match(r"^(\s*)-\s*\[[ \-x\+\*]\]\s*(\d+)\.?\s*", line)
-                if task_match:
-                    indent_str, existing_id = task_match.groups()
-                    # Only consider root tasks (no indentation)
-                    if len(indent_str) == 0:
-                        existing_num = int(existing_id)
-                        if existing_num < target_id:
-                            # Find the end of this task and its sub-tasks
-                            last_root_position = self._find_task_end_line_by_index(i)
-                        else:
-                            break
+            for position, existing_id in enumerate(self._line_order):
+                # Only consider root tasks (no indentation)
+                if self.tasks[existing_id].indent_level == 0:
+                    existing_num = int(existing_id.split(".", 1)[0])
+                    if existing_num < target_id:
+                        # Find the end of this task and its sub-tasks
+                        last_root_position = self._find_task_end_line_by_position(
+                            position
+                        )
+                    else:
+                        break
 
             return last_root_position
 
@@ -1670,36 +2153,32 @@ class TaskParser:
         parent_id = self._get_parent_task_id(task_id)
         if parent_id and parent_id in self.tasks:
             parent_task = self.tasks[parent_id]
-            parent_start = parent_task.line_number
             parent_end = self._find_task_end_line(parent_id)
 
             # Find the last sub-task at the same level
             target_parts = task_id.split(".")
             target_num = int(target_parts[-1])
 
-            insert_pos = parent_start  # Default to after parent task line
+            insert_pos = parent_task.line_number  # Default to after parent task line
 
-            for i in range(parent_start, parent_end):
-                if i >= len(self.file_lines):
+            for position in range(
+                self._line_position[parent_id] + 1, len(self._line_order)
+            ):
+                existing_id = self._line_order[position]
+                if self.tasks[existing_id].line_number > parent_end:
                     break
-                line = self.file_lines[i]
-                task_match = re.match(
-                    r"^(\s*)-\s*\[[ \-x\+\*]\]\s*(\d+(?:\.\d+)*)\.?\s*", line
-                )
-                if task_match:
-                    indent_str, existing_id = task_match.groups()
-                    existing_parts = existing_id.split(".")
+                existing_parts = existing_id.split(".")
 
-                    # Check if this is a sibling (same parent, same level)
-                    if (
-                        len(existing_parts) == len(target_parts)
-                        and existing_parts[:-1] == target_parts[:-1]
-                    ):
-                        existing_num = int(existing_parts[-1])
-                        if existing_num < target_num:
-                            insert_pos = self._find_task_end_line_by_index(i)
-                        else:
-                            break
+                # Check if this is a sibling (same parent, same level)
+                if (
+                    len(existing_parts) == len(target_parts)
+                    and existing_parts[:-1] == target_parts[:-1]
+                ):
+                    existing_num = int(existing_parts[-1])
+                    if existing_num < target_num:
+                        insert_pos = self._find_task_end_line_by_position(position)
+                    else:
+                        break
 
             return insert_pos
 
@@ -1711,44 +2190,34 @@ class TaskParser:
         if task_id not in self.tasks:
             return len(self.file_lines)
 
-        task = self.tasks[task_id]
-        return self._find_task_end_line_by_index(task.line_number - 1)
-
-    def _find_task_end_line_by_index(self, start_index: int) -> int:
-        """Find where a task ends starting from a given line index"""
-        if start_index >= len(self.file_lines):
-            return len(self.file_lines)
-
-        # Get the indent level of the starting task
-        start_line = self.file_lines[start_index]
-        task_match = re.match(
-            r"^(\s*)-\s*\[[ \-x\+\*]\]\s*(\d+(?:\.\d+)*)\.?\s*", start_line
-        )
-        if not task_match:
-            return start_index + 1
+        return self._find_task_end_line_by_position(self._line_position[task_id])
 
-        start_indent = len(task_match.group(1))
+    def _find_task_end_line_by_position(self, position: int) -> int:
+        """Find where the task at a given position of the file-ordered task list ends
 
-        # Find the next task at the same or higher level
-        for i in range(start_index + 1, len(self.file_lines)):
-            line = self.file_lines[i]
-            task_match = re.match(
-                r"^(\s*)-\s*\[[ \-x\+\*]\]\s*(\d+(?:\.\d+)*)\.?\s*", line
-            )
-            if task_match:
-                line_indent = len(task_match.group(1))
-                if line_indent <= start_indent:
-                    return i
+        The task ends at the next task line at the same or higher level.
+        """
+        start_indent = self.tasks[self._line_order[position]].indent_level
+        for next_id in self._line_order[position + 1 :]:
+            next_task = self.tasks[next_id]
+            if next_task.indent_level <= start_indent:
+                return next_task.line_number - 1
 
         return len(self.file_lines)
 
     def _get_all_sub_tasks(self, task_id: str) -> List[str]:
         """Get all sub-tasks (direct and indirect) of a given task"""
+        sort_key = self._sort_key(task_id)
+        depth = len(sort_key)
         all_sub_tasks = []
-        for tid in self.tasks.keys():
-            if tid.startswith(task_id + "."):
-                all_sub_tasks.append(tid)
-        return sorted(all_sub_tasks, key=self._sort_key)
+        index = bisect_right(self._sorted_keys, sort_key)
+        while (
+            index < len(self._sorted_keys)
+            and self._sorted_keys[index][:depth] == sort_key
+        ):
+            all_sub_tasks.append(self._sorted_ids[index])
+            index += 1
+        return all_sub_tasks
 
     def filter_tasks(
         self,
@@ -1757,24 +2226,32 @@ class TaskParser:
         dependencies_filter: Optional[List[str]] = None,
     ):
         """Filter tasks by status, requirements, or dependencies"""
-        filtered_tasks = {}
+        filtered_tasks = []
+
+        # Tasks must have ALL specified requirements and dependencies, so the
+        # candidates are the intersection of the tasks listing each of them
+        candidate_ids = None
+        for index, filter_ids in (
+            (self._tasks_requiring, requirements_filter),
+            (self._dependents_of, dependencies_filter),
+        ):
+            for item_id in filter_ids or ():
+                holders = index.get(item_id, ())
+                if candidate_ids is None:
+                    candidate_ids = set(holders)
+                else:
+                    candidate_ids.intersection_update(holders)
 
-        for task_id, task in self.tasks.items():
+        # Walk the tasks in hierarchical order so the matches need no sorting
+        for task_id in self._sorted_ids:
+            if candidate_ids is not None and task_id not in candidate_ids:
+                continue
+            task = self.tasks[task_id]
             # Filter by status
             if status_filter and task.status.value != status_filter:
                 continue
 
-            # Filter by requirements (task must have ALL specified requirements)
-            if requirements_filter:
-                if not all(req in task.requirements for req in requirements_filter):
-                    continue
-
-            # Filter by dependencies (task must have ALL specified dependencies)
-            if dependencies_filter:
-                if not all(dep in task.dependencies for dep in dependencies_filter):
-                    continue
-
-            filtered_tasks[task_id] = task
+            filtered_tasks.append(task)
 
         if not filtered_tasks:
             print("No tasks match the specified filters.")
@@ -1789,27 +2266,32 @@ class TaskParser:
             print(f"  Dependencies: {', '.join(dependencies_filter)}")
         print("-" * 60)
 
-        # Sort and display filtered tasks
-        sorted_task_ids = sorted(filtered_tasks.keys(), key=self._sort_key)
-        for task_id in sorted_task_ids:
-            task = filtered_tasks[task_id]
-            indent = "    " * (task.task_id.count("."))
-            print(f"{indent}{task}")
+        self._write_task_lines(filtered_tasks)
 
     def search_tasks(self, keywords: List[str]):
         """Search tasks by keywords in description/content"""
-        matching_tasks = {}
+        matching_tasks = []
 
         # Convert keywords to lowercase for case-insensitive search
         lower_keywords = [kw.lower() for kw in keywords]
+        # Match many keywords in a single scan of each task's text
+        keyword_re = None
+        if len(lower_keywords) > 3:
+            keyword_re = re.compile("|".join(map(re.escape, lower_keywords)))
 
-        for task_id, task in self.tasks.items():
+        # Walk the tasks in hierarchical order so the matches need no sorting
+        for task_id in self._sorted_ids:
+            task = self.tasks[task_id]
             # Search in description and full content
             search_text = f"{task.description} {task.full_content}".lower()
 
             # Check if any keyword matches
-            if any(keyword in search_text for keyword in lower_keywords):
-                matching_tasks[task_id] = task
+            if keyword_re is not None:
+                matched = keyword_re.search(search_text) is not None
+            else:
+                matched = any(kw in search_text for kw in lower_keywords)
+            if matched:
+                matching_tasks.append(task)
 
         if not matching_tasks:
             print(f"No tasks found containing keywords: {', '.join(keywords)}")
@@ -1819,44 +2301,35 @@ class TaskParser:
         print(f"  Keywords: {', '.join(keywords)}")
         print("-" * 60)
 
-        # Sort and display matching tasks
-        sorted_task_ids = sorted(matching_tasks.keys(), key=self._sort_key)
-        for task_id in sorted_task_ids:
-            task = matching_tasks[task_id]
-            indent = "    " * (task.task_id.count("."))
-            print(f"{indent}{task}")
+        self._write_task_lines(matching_tasks)
 
     def ready_tasks(self):
         """Show only tasks that are ready to work on"""
-        ready_tasks = {}
+        ready_tasks = []
 
-        for task_id, task in self.tasks.items():
+        # Walk the tasks in hierarchical order so the matches need no sorting
+        for task_id in self._sorted_ids:
+            task = self.tasks[task_id]
             # Only consider pending tasks
             if task.status != TaskStatus.PENDING:
                 continue
 
             # Check if all dependencies are satisfied
-            dependencies_satisfied = True
-            for dep_id in task.dependencies:
-                if dep_id not in self.tasks:
-                    dependencies_satisfied = False
-                    break
-                dep_task = self.tasks[dep_id]
-                if dep_task.status not in [TaskStatus.DONE, TaskStatus.REVIEW]:
-                    dependencies_satisfied = False
-                    break
+            dependencies_satisfied = all(
+                dep_id in self.tasks
+                and self.tasks[dep_id].status in _SATISFIED_STATUSES
+                for dep_id in task.dependencies
+            )
 
             # For sub-tasks, also check if parent allows progression
-            if self._is_sub_task(task_id):
-                parent_id = self._get_parent_task_id(task_id)
-                if parent_id and parent_id in self.tasks:
-                    parent_task = self.tasks[parent_id]
-                    # Sub-task can only be worked on if parent is not pending or done
-                    if parent_task.status in [TaskStatus.PENDING, TaskStatus.DONE]:
-                        dependencies_satisfied = False
+            parent_task = self.tasks.get(self._parent_of.get(task_id))
+            if parent_task is not None:
+                # Sub-task can only be worked on if parent is not pending or done
+                if parent_task.status in _BLOCKING_PARENT_STATUSES:
+                    dependencies_satisfied = False
 
             if dependencies_satisfied:
-                ready_tasks[task_id] = task
+                ready_tasks.append(task)
 
         if not ready_tasks:
             print(
@@ -1867,25 +2340,39 @@ class TaskParser:
         print(f"Ready Tasks from {self.file_path}:")
         print("-" * 60)
 
-        # Sort and display ready tasks
-        sorted_task_ids = sorted(ready_tasks.keys(), key=self._sort_key)
-        for task_id in sorted_task_ids:
-            task = ready_tasks[task_id]
-            indent = "    " * (task.task_id.count("."))
-            print(f"{indent}{task}")
+        self._write_task_lines(ready_tasks)
 
     def export_json(self, output_file: Optional[str] = None):
         """Export task data to JSON format"""
-        export_data = {
+        export_fields = {
             "file_path": self.file_path,
             "export_timestamp": datetime.now().isoformat(),
             "statistics": self.progress_tracker.get_statistics(self.file_path),
-            "tasks": {},
         }
+        # Tasks are serialized one at a time as the output is written
+        chunks = _iter_json_object_bytes(
+            export_fields, "tasks", self._iter_export_tasks()
+        )
+
+        # Write to file or stdout
+        if output_file:
+            try:
+                with open(output_file, "wb") as f:
+                    f.writelines(chunks)
+                print(f"Exported task data to {output_file}")
+            except Exception as e:
+                print(f"Error writing to file {output_file}: {e}")
+        else:
+            # Print to stdout
+            for chunk in chunks:
+                sys.stdout.write(chunk.decode("utf-8"))
+            sys.stdout.write("\n")
 
-        # Export all task data
+    def _iter_export_tasks(self):
+        """Yield (task_id, export dict) pairs for every task"""
+        file_history = self.progress_tracker.get_file_history(self.file_path)
         for task_id, task in self.tasks.items():
-            task_data = {
+            yield task_id, {
                 "id": task.task_id,
                 "description": task.description,
                 "status": task.status.value,
@@ -1894,32 +2381,11 @@ class TaskParser:
                 "line_number": task.line_number,
                 "indent_level": task.indent_level,
                 "full_content": task.full_content,
-                "is_sub_task": self._is_sub_task(task_id),
-                "parent_task": (
-                    self._get_parent_task_id(task_id)
-                    if self._is_sub_task(task_id)
-                    else None
-                ),
-                "sub_tasks": (
-                    self._get_sub_tasks(task_id) if self._has_sub_tasks(task_id) else []
-                ),
-                "status_history": self.progress_tracker.get_task_history(
-                    self.file_path, task_id
-                ),
+                "is_sub_task": task_id in self._parent_of,
+                "parent_task": self._parent_of.get(task_id),
+                "sub_tasks": list(self._children_of.get(task_id, ())),
+                "status_history": file_history.get(task_id, []),
             }
-            export_data["tasks"][task_id] = task_data
-
-        # Write to file or stdout
-        if output_file:
-            try:
-                with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
-                print(f"Exported task data to {output_file}")
-            except Exception as e:
-                print(f"Error writing to file {output_file}: {e}")
-        else:
-            # Print to stdout
-            print(json.dumps(export_data, indent=2, ensure_ascii=False))
 
 
 def validate_task_id(task_id: str) -> bool:
@@ -1936,9 +2402,7 @@ def validate_task_id(task_id: str) -> bool:
     if not task_id or not isinstance(task_id, str):
         return False
 
-    # Pattern: start with digit, then optionally dot and digit, repeating
-    pattern = r"^\d+(\.\d+)*$"
-    return bool(re.match(pattern, task_id.strip()))
+    return _TASK_ID_RE.fullmatch(task_id.strip()) is not None
 
 
 def validate_task_ids(task_ids: List[str]) -> tuple[bool, Optional[str]]:
@@ -1964,6 +2428,23 @@ def validate_task_ids(task_ids: List[str]) -> tuple[bool, Optional[str]]:
     return True, None
 
 
+def load_tasks_local_data(
+    tasks_local_file: str = ".tasks.local.json",
+) -> Optional[Dict]:
+    """
+    Read .tasks.local.json once so it can be shared by file path detection and
+    auto-selection.
+
+    Returns:
+        Optional[Dict]: The parsed data, or None if the file is missing or unreadable
+    """
+    try:
+        with open(tasks_local_file, "rb") as f:
+            return _load_json_bytes(f.read())
+    except Exception:
+        return None
+
+
 def detect_file_path_in_args(
     args, tasks_local_data: Optional[Dict] = None
 ) -> tuple[Optional[str], object]:
@@ -1980,66 +2461,78 @@ def detect_file_path_in_args(
     """
     # Load .tasks.local.json if not provided
     if tasks_local_data is None:
-        tasks_local_file = ".tasks.local.json"
-        if not os.path.exists(tasks_local_file):
-            return None, args
-
-        try:
-            with open(tasks_local_file, "r", encoding="utf-8") as f:
-                tasks_local_data = json.load(f)
-        except (json.JSONDecodeError, Exception):
-            return None, args
+        tasks_local_data = load_tasks_local_data()
 
     if not tasks_local_data:
         return None, args
 
+    # Resolve paths against the working directory read once, which is what
+    # os.path.abspath does on every call
+    cwd = os.getcwd()
+
+    def is_known_file_path(value: str) -> bool:
+        if value in known_file_paths:
+            return True
+        # A value without path separators resolves to cwd/value, so unless its
+        # name is one of the known file names it cannot match; this skips path
+        # resolution for ordinary task IDs, keywords and descriptions
+        if (
+            "/" not in value
+            and os.sep not in value
+            and value not in (".", "..")
+            and value not in known_file_names
+        ):
+            return False
+        return os.path.normpath(os.path.join(cwd, value)) in known_file_paths
+
     # Get absolute paths from .tasks.local.json for comparison
-    known_file_paths = set()
-    for file_path in tasks_local_data.keys():
-        known_file_paths.add(os.path.abspath(file_path))
-        known_file_paths.add(file_path)  # Also add original path
+    known_file_paths = set(tasks_local_data)  # Also add original paths
+    known_file_paths.update(
+        os.path.normpath(os.path.join(cwd, file_path)) for file_path in tasks_local_data
+    )
+    known_file_names = {os.path.basename(file_path) for file_path in known_file_paths}
 
     # Check different argument fields that could contain a mistaken file path
     detected_file_path = None
 
     # Check task_id field (for show-task command)
-    if hasattr(args, "task_id") and args.task_id:
-        abs_path = os.path.abspath(args.task_id)
-        if abs_path in known_file_paths or args.task_id in known_file_paths:
+    if getattr(args, "task_id", None):
+        if is_known_file_path(args.task_id):
             detected_file_path = args.task_id
             args.task_id = ""  # Clear the mistaken field
 
     # Check description field (for add-task command)
-    if hasattr(args, "description") and args.description:
-        abs_path = os.path.abspath(args.description)
-        if abs_path in known_file_paths or args.description in known_file_paths:
+    if getattr(args, "description", None):
+        if is_known_file_path(args.description):
             detected_file_path = args.description
             args.description = ""  # Clear the mistaken field
 
     # Check keywords field (for search-tasks command)
-    if hasattr(args, "keywords") and args.keywords:
+    if getattr(args, "keywords", None):
         for i, keyword in enumerate(args.keywords):
-            abs_path = os.path.abspath(keyword)
-            if abs_path in known_file_paths or keyword in known_file_paths:
+            if is_known_file_path(keyword):
                 detected_file_path = keyword
                 # Remove this keyword from the list
-                args.keywords = [kw for j, kw in enumerate(args.keywords) if j != i]
+                del args.keywords[i]
                 break
 
     # Check task_ids field (for set-status, delete-task commands)
-    if hasattr(args, "task_ids") and args.task_ids:
+    if getattr(args, "task_ids", None):
         for i, task_id in enumerate(args.task_ids):
-            abs_path = os.path.abspath(task_id)
-            if abs_path in known_file_paths or task_id in known_file_paths:
+            if is_known_file_path(task_id):
                 detected_file_path = task_id
                 # Remove this item from task_ids
-                args.task_ids = [tid for j, tid in enumerate(args.task_ids) if j != i]
+                del args.task_ids[i]
                 break
 
     return detected_file_path, args
 
 
-def resolve_file_path(file_argument: str, is_running_as_claude_hook: bool) -> str:
+def resolve_file_path(
+    file_argument: str,
+    is_running_as_claude_hook: bool,
+    tasks_local_data: Optional[Dict] = None,
+) -> str:
     """
     Resolve the file path argument. If file_argument is empty or None,
     automatically select the task file with the most recent last_modified
@@ -2048,6 +2541,7 @@ def resolve_file_path(file_argument: str, is_running_as_claude_hook: bool) -> st
     Args:
         file_argument: The file path argument from command line
         is_running_as_claude_hook: True indicate this CLI is being used as claude hook script
+        tasks_local_data: Optional pre-loaded .tasks.local.json data
 
     Returns:
         str: The resolved file path
@@ -2061,26 +2555,28 @@ def resolve_file_path(file_argument: str, is_running_as_claude_hook: bool) -> st
     # Define a fail fast mechanism to be used to exit with code 0 when running as claude hook
     failfastFunc = lambda: sys.exit(0) if is_running_as_claude_hook else None
 
-    # Try to read .tasks.local.json
-    tasks_local_file = ".tasks.local.json"
-    if not os.path.exists(tasks_local_file):
-        failfastFunc()
-        print(
-            f"Error: .tasks.local.json file not found. Please provide a valid file path to a tasks.md file.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+    # Try to read .tasks.local.json unless the caller already loaded it
+    tasks_data = tasks_local_data
+    if tasks_data is None:
+        tasks_local_file = ".tasks.local.json"
+        if not os.path.exists(tasks_local_file):
+            failfastFunc()
+            print(
+                f"Error: .tasks.local.json file not found. Please provide a valid file path to a tasks.md file.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
 
-    try:
-        with open(tasks_local_file, "r", encoding="utf-8") as f:
-            tasks_data = json.load(f)
-    except (json.JSONDecodeError, Exception) as e:
-        failfastFunc()
-        print(
-            f"Error: Could not read .tasks.local.json: {e}. Please provide a valid file path to a tasks.md file.",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        try:
+            with open(tasks_local_file, "rb") as f:
+                tasks_data = _load_json_bytes(f.read())
+        except Exception as e:
+            failfastFunc()
+            print(
+                f"Error: Could not read .tasks.local.json: {e}. Please provide a valid file path to a tasks.md file.",
+                file=sys.stderr,
+            )
+            sys.exit(1)
 
     # Check if the data is empty
     if not tasks_data or tasks_data == {}:
@@ -2091,29 +2587,32 @@ def resolve_file_path(file_argument: str, is_running_as_claude_hook: bool) -> st
         )
         sys.exit(1)
 
-    # Find the entry with the most recent last_modified timestamp
-    most_recent_file = None
-    most_recent_timestamp = None
-
+    # Collect the entries with a valid last_modified timestamp
+    candidates = []
     for file_path, file_data in tasks_data.items():
         if not isinstance(file_data, dict) or "last_modified" not in file_data:
             continue
 
-        # Skip files that don't exist on the filesystem
-        if not os.path.exists(file_path):
-            continue
-
         try:
             timestamp_str = file_data["last_modified"]
             # Parse ISO format timestamp
             timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-
-            if most_recent_timestamp is None or timestamp > most_recent_timestamp:
-                most_recent_timestamp = timestamp
-                most_recent_file = file_path
-        except (ValueError, TypeError):
+        except (ValueError, TypeError, AttributeError):
             # Skip entries with invalid timestamps
             continue
+        if timestamp.tzinfo is not None:
+            # Compare in local time like the naive timestamps the tracker writes
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        candidates.append((timestamp, file_path))
+
+    # Pick the most recent entry whose file still exists, checking the
+    # filesystem only until one is found (ties keep the first entry)
+    most_recent_file = None
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    for _, file_path in candidates:
+        if os.path.exists(file_path):
+            most_recent_file = file_path
+            break
 
     if most_recent_file is None:
         failfastFunc()
@@ -2127,6 +2626,286 @@ def resolve_file_path(file_argument: str, is_running_as_claude_hook: bool) -> st
     return most_recent_file
 
 
+def _run_list_tasks(task_parser: TaskParser, args):
+    """Run the list-tasks command"""
+    task_parser.list_tasks()
+
+
+def _run_show_task(task_parser: TaskParser, args):
+    """Run the show-task command"""
+    task_parser.show_task(args.task_id)
+
+
+def _run_set_status(task_parser: TaskParser, args):
+    """Run the set-status command"""
+    if len(args.task_ids) == 1:
+        task_parser.set_status(args.task_ids[0], args.status)
+    else:
+        task_parser.set_status_bulk(args.task_ids, args.status)
+
+
+def _run_add_task(task_parser: TaskParser, args):
+    """Run the add-task command"""
+    task_parser.add_task(
+        args.task_id, args.description, args.dependencies, args.requirements
+    )
+
+
+def _run_update_task(task_parser: TaskParser, args):
+    """Run the update-task command"""
+    task_parser.update_task(
+        args.task_id,
+        add_dependencies=args.add_dependencies,
+        add_requirements=args.add_requirements,
+        remove_dependencies=args.remove_dependencies,
+        remove_requirements=args.remove_requirements,
+        clear_dependencies=args.clear_dependencies,
+        clear_requirements=args.clear_requirements,
+    )
+
+
+def _run_delete_task(task_parser: TaskParser, args):
+    """Run the delete-task command"""
+    task_parser.delete_task(args.task_ids)
+
+
+def _run_get_next_task(task_parser: TaskParser, args):
+    """Run the get-next-task command"""
+    wait_duration = None
+    if args.wait:
+        try:
+            wait_duration = parse_duration(args.wait)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    task_parser.get_next_task(wait_duration=wait_duration)
+
+
+def _run_check_dependencies(task_parser: TaskParser, args):
+    """Run the check-dependencies command"""
+    task_parser.validate_dependencies()
+
+
+def _run_show_progress(task_parser: TaskParser, args):
+    """Run the show-progress command"""
+    task_parser.show_progress()
+
+
+def _run_filter_tasks(task_parser: TaskParser, args):
+    """Run the filter-tasks command"""
+    task_parser.filter_tasks(args.status, args.requirements, args.dependencies)
+
+
+def _run_search_tasks(task_parser: TaskParser, args):
+    """Run the search-tasks command"""
+    task_parser.search_tasks(args.keywords)
+
+
+def _run_ready_tasks(task_parser: TaskParser, args):
+    """Run the ready-tasks command"""
+    task_parser.ready_tasks()
+
+
+def _run_export(task_parser: TaskParser, args):
+    """Run the export command"""
+    task_parser.export_json(args.output)
+
+
+def _run_track_progress(task_parser: TaskParser, args):
+    """Run the track-progress command"""
+    resolved_file_path = task_parser.file_path
+    if getattr(args, "track_command", None) is None:
+        print("Error: No sub-command specified for track-progress.", file=sys.stderr)
+        print(
+            "Use 'track-progress add', 'track-progress check', or 'track-progress clear'.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    if args.track_command == "add":
+        try:
+            condition = task_parser.progress_tracker.add_tracking_condition(
+                resolved_file_path,
+                args.task_ids,
+                args.valid_for,
+                args.complete_more,
+                task_parser.tasks,
+            )
+
+            # Format confirmation message
+            valid_until = condition["valid_before"]
+            tasks_str = ", ".join(args.task_ids)
+            print(f"Added tracking condition for tasks: {tasks_str}")
+            print(f"Valid until: {valid_until}")
+
+            if "expect_completed" in condition:
+                print(
+                    f"Expected total completed tasks: {condition['expect_completed']}"
+                )
+
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    elif args.track_command == "check":
+        # Handle Claude hook mode (switch the exit_code if detect infinite hook situation)
+        is_claude_hook_mode = getattr(args, "claude_hook", False)
+
+        if is_claude_hook_mode:
+            # Use exit code 1 if in Claude hook mode to prevent infinite loop
+            # Use exit code 2 will make Claude continue and not stopping if hook is enabled
+            hook_input = task_parser.progress_tracker.read_claude_hook_input()
+            is_session_start = hook_input.get("hook_event_name") == "SessionStart"
+
+            if (
+                hook_input.get("hook_event_name") == "Stop"
+                and hook_input.get("stop_hook_active") is True
+            ):
+                # Check for infinite loop prevention
+                transcript_path = hook_input.get("transcript_path")
+
+                if transcript_path:
+                    if task_parser.progress_tracker.detect_infinite_loop(
+                        transcript_path
+                    ):
+                        # Use exit code 1 to prevent infinite loop
+                        print(
+                            "Infinite loop detected in Claude hook. Exiting to prevent further execution.",
+                            file=sys.stderr,
+                        )
+                        # Output JSON response for Claude hook (allow Claude to stop)
+                        response = (
+                            task_parser.progress_tracker.output_claude_hook_response(
+                                block=False
+                            )
+                        )
+                        print(response)
+                        sys.stdout.flush()
+                        sys.exit(1)
+                else:
+                    # No transcript path, use exit code 1 to be safe
+                    print(
+                        "No transcript path provided in Claude hook. Exiting to prevent potential infinite loop.",
+                        file=sys.stderr,
+                    )
+                    # Output JSON response for Claude hook (allow Claude to stop)
+                    response = task_parser.progress_tracker.output_claude_hook_response(
+                        block=False
+                    )
+                    print(response)
+                    sys.stdout.flush()
+                    sys.exit(1)
+
+        # Proceed with normal tracking condition check
+        unmet_conditions = task_parser.progress_tracker.check_tracking_conditions(
+            resolved_file_path, task_parser.tasks
+        )
+
+        if unmet_conditions:
+            # Build detailed reason message for Claude
+            reason_parts = ["Completion conditions not met:"]
+            for i, unmet in enumerate(unmet_conditions, 1):
+                condition = unmet["condition"]
+                reason_parts.append(f"\nCondition {i}:")
+                reason_parts.append(
+                    f"  Required tasks: {', '.join(condition['tasks_to_complete'])}"
+                )
+
+                if unmet["unmet_tasks"]:
+                    reason_parts.append("  Issues:")
+                    for issue in unmet["unmet_tasks"]:
+                        reason_parts.append(f"    - {issue}")
+
+                if unmet["total_count_issue"]:
+                    reason_parts.append(
+                        f"  Total count issue: {unmet['total_count_issue']}"
+                    )
+
+            reason_message = "\n".join(reason_parts)
+
+            if is_claude_hook_mode:
+                # Output JSON response for Claude hook (block Claude from stopping)
+                reason_message += (
+                    "\n\nIMPORTANCE: Please continue working on the remaining tasks to meet the completion conditions. Task file location: "
+                    + resolved_file_path
+                )
+                if is_session_start and hook_input.get("source") == "compact":
+                    reason_message += '\n\nSYSTEM: You MUST use `mcp__gosu__get_prompt` tool to retrieve the prompt with id: "workflow-of-command-task-list-md-execute" and follow the workflow step by steps. You should start from **Phase 2: Execute Tasks One by One**'
+                # Exit code 2: output to stderr for both SessionStart and Stop
+                if is_session_start:
+                    response = task_parser.progress_tracker.output_claude_hook_session_start_response(
+                        reason_message
+                    )
+                    print(response)
+                    sys.exit(0)  # SessionStart always expect exitcode 0
+                else:
+                    response = task_parser.progress_tracker.output_claude_hook_response(
+                        block=True, reason=reason_message
+                    )
+                    print(response, file=sys.stderr)
+            else:
+                # Normal mode: print to stderr
+                print(reason_message, file=sys.stderr)
+
+            sys.exit(2)
+        else:
+            if is_claude_hook_mode:
+                # Output JSON response for Claude hook (allow Claude to stop)
+                if is_session_start:
+                    response = task_parser.progress_tracker.output_claude_hook_session_start_response(
+                        ""
+                    )
+                else:
+                    response = task_parser.progress_tracker.output_claude_hook_response(
+                        block=False
+                    )
+                print(response)
+                sys.stdout.flush()
+            else:
+                print("All completion conditions are satisfied.")
+
+    elif args.track_command == "clear":
+        success = task_parser.progress_tracker.clear_tracking_conditions(
+            resolved_file_path, force=args.yes
+        )
+        if not success:
+            sys.exit(1)
+
+
+# Commands that never edit the task file, so it can be parsed without keeping its lines
+_READ_ONLY_COMMANDS = frozenset(
+    {
+        "list-tasks",
+        "show-task",
+        "get-next-task",
+        "check-dependencies",
+        "show-progress",
+        "filter-tasks",
+        "search-tasks",
+        "ready-tasks",
+        "export",
+    }
+)
+
+# Command handlers keyed by sub-command name, called as handler(task_parser, args)
+_COMMAND_HANDLERS = {
+    "list-tasks": _run_list_tasks,
+    "show-task": _run_show_task,
+    "set-status": _run_set_status,
+    "add-task": _run_add_task,
+    "update-task": _run_update_task,
+    "delete-task": _run_delete_task,
+    "get-next-task": _run_get_next_task,
+    "check-dependencies": _run_check_dependencies,
+    "show-progress": _run_show_progress,
+    "filter-tasks": _run_filter_tasks,
+    "search-tasks": _run_search_tasks,
+    "ready-tasks": _run_ready_tasks,
+    "export": _run_export,
+    "track-progress": _run_track_progress,
+}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Task List MD CLI - Parse and manage hierarchical tasks list from markdown files (tasks.md)",
@@ -2470,53 +3249,60 @@ def main():
         parser.print_help()
         return
 
+    # Read .tasks.local.json once for file path detection and auto-selection
+    tasks_local_data = load_tasks_local_data()
+
     # Detect if any string argument is actually a file path from .tasks.local.json
-    detected_file_path, args = detect_file_path_in_args(args)
+    detected_file_path, args = detect_file_path_in_args(args, tasks_local_data)
 
     # If we detected a file path in other arguments, use it to override the file argument
     if detected_file_path:
         print(f"Detected file path in arguments: {detected_file_path}")
         args.file = detected_file_path
 
+    # Read the command-specific arguments once; None means the command has no such argument
+    task_id = getattr(args, "task_id", None)
+    task_ids = getattr(args, "task_ids", None)
+    description = getattr(args, "description", None)
+    keywords = getattr(args, "keywords", None)
+
     # Validate task IDs for commands that use them
-    if hasattr(args, "task_id"):
-        if not args.task_id or not args.task_id.strip():
+    if task_id is not None:
+        if not task_id or not task_id.strip():
             print("Error: Task ID is required for this command.", file=sys.stderr)
             sys.exit(1)
-        if not validate_task_id(args.task_id):
+        if not validate_task_id(task_id):
             print(
-                f"Error: Invalid task ID format: '{args.task_id}'. Expected format: digits with optional dots (e.g., '1', '1.2', '1.2.3')",
+                f"Error: Invalid task ID format: '{task_id}'. Expected format: digits with optional dots (e.g., '1', '1.2', '1.2.3')",
                 file=sys.stderr,
             )
             sys.exit(1)
 
-    if hasattr(args, "task_ids") and args.task_ids:
-        is_valid, error_message = validate_task_ids(args.task_ids)
+    if task_ids:
+        is_valid, error_message = validate_task_ids(task_ids)
         if not is_valid:
             print(f"Error: {error_message}", file=sys.stderr)
             sys.exit(1)
 
     # Validate that required string arguments are not empty after file path detection
-    if hasattr(args, "description") and hasattr(args, "task_id"):  # add-task command
-        if not args.description or not args.description.strip():
+    if description is not None and task_id is not None:  # add-task command
+        if not description or not description.strip():
             print(
                 "Error: Description argument is required for add-task command.",
                 file=sys.stderr,
             )
             sys.exit(1)
 
-    if hasattr(args, "keywords") and args.keywords is not None:  # search-tasks command
-        if not args.keywords or all(not kw.strip() for kw in args.keywords):
+    if keywords is not None:  # search-tasks command
+        if not keywords or all(not kw.strip() for kw in keywords):
             print(
                 "Error: At least one keyword is required for search-tasks command.",
                 file=sys.stderr,
             )
             sys.exit(1)
 
-    if (
-        hasattr(args, "task_ids") and args.task_ids is not None
-    ):  # Commands with task_ids
-        if not args.task_ids:
+    if task_ids is not None:  # Commands with task_ids
+        if not task_ids:
             if args.command in ["set-status", "delete-task"]:
                 print(
                     f"Error: At least one task ID is required for {args.command} command.",
@@ -2526,222 +3312,18 @@ def main():
 
     # Resolve the file path (auto-select from .tasks.local.json if not provided)
     resolved_file_path = resolve_file_path(
-        getattr(args, "file", None), hasattr(args, "claude_hook") and args.claude_hook
+        getattr(args, "file", None),
+        getattr(args, "claude_hook", False),
+        tasks_local_data,
     )
 
     # Initialize task parser
-    task_parser = TaskParser(resolved_file_path)
+    task_parser = TaskParser(
+        resolved_file_path, keep_lines=args.command not in _READ_ONLY_COMMANDS
+    )
 
     # Execute the requested command
-    if args.command == "list-tasks":
-        task_parser.list_tasks()
-    elif args.command == "show-task":
-        task_parser.show_task(args.task_id)
-    elif args.command == "set-status":
-        if len(args.task_ids) == 1:
-            task_parser.set_status(args.task_ids[0], args.status)
-        else:
-            task_parser.set_status_bulk(args.task_ids, args.status)
-    elif args.command == "add-task":
-        task_parser.add_task(
-            args.task_id, args.description, args.dependencies, args.requirements
-        )
-    elif args.command == "update-task":
-        task_parser.update_task(
-            args.task_id,
-            add_dependencies=args.add_dependencies,
-            add_requirements=args.add_requirements,
-            remove_dependencies=args.remove_dependencies,
-            remove_requirements=args.remove_requirements,
-            clear_dependencies=args.clear_dependencies,
-            clear_requirements=args.clear_requirements,
-        )
-    elif args.command == "delete-task":
-        task_parser.delete_task(args.task_ids)
-    elif args.command == "get-next-task":
-        wait_duration = None
-        if args.wait:
-            try:
-                wait_duration = parse_duration(args.wait)
-            except ValueError as e:
-                print(f"Error: {e}", file=sys.stderr)
-                sys.exit(1)
-        task_parser.get_next_task(wait_duration=wait_duration)
-    elif args.command == "check-dependencies":
-        task_parser.validate_dependencies()
-    elif args.command == "show-progress":
-        task_parser.show_progress()
-    elif args.command == "filter-tasks":
-        task_parser.filter_tasks(args.status, args.requirements, args.dependencies)
-    elif args.command == "search-tasks":
-        task_parser.search_tasks(args.keywords)
-    elif args.command == "ready-tasks":
-        task_parser.ready_tasks()
-    elif args.command == "export":
-        task_parser.export_json(args.output)
-    elif args.command == "track-progress":
-        if not hasattr(args, "track_command") or args.track_command is None:
-            print(
-                "Error: No sub-command specified for track-progress.", file=sys.stderr
-            )
-            print(
-                "Use 'track-progress add', 'track-progress check', or 'track-progress clear'.",
-                file=sys.stderr,
-            )
-            sys.exit(1)
-
-        if args.track_command == "add":
-            try:
-                condition = task_parser.progress_tracker.add_tracking_condition(
-                    resolved_file_path,
-                    args.task_ids,
-                    args.valid_for,
-                    args.complete_more,
-                    task_parser.tasks,
-                )
-
-                # Format confirmation message
-                valid_until = condition["valid_before"]
-                tasks_str = ", ".join(args.task_ids)
-                print(f"Added tracking condition for tasks: {tasks_str}")
-                print(f"Valid until: {valid_until}")
-
-                if "expect_completed" in condition:
-                    print(
-                        f"Expected total completed tasks: {condition['expect_completed']}"
-                    )
-
-            except ValueError as e:
-                print(f"Error: {e}", file=sys.stderr)
-                sys.exit(1)
-
-        elif args.track_command == "check":
-            # Handle Claude hook mode (switch the exit_code if detect infinite hook situation)
-            is_claude_hook_mode = hasattr(args, "claude_hook") and args.claude_hook
-
-            if is_claude_hook_mode:
-                # Use exit code 1 if in Claude hook mode to prevent infinite loop
-                # Use exit code 2 will make Claude continue and not stopping if hook is enabled
-                hook_input = task_parser.progress_tracker.read_claude_hook_input()
-                is_session_start = hook_input.get("hook_event_name") == "SessionStart"
-
-                if (
-                    hook_input.get("hook_event_name") == "Stop"
-                    and hook_input.get("stop_hook_active") is True
-                ):
-                    # Check for infinite loop prevention
-                    transcript_path = hook_input.get("transcript_path")
-
-                    if transcript_path:
-                        if task_parser.progress_tracker.detect_infinite_loop(
-                            transcript_path
-                        ):
-                            # Use exit code 1 to prevent infinite loop
-                            print(
-                                "Infinite loop detected in Claude hook. Exiting to prevent further execution.",
-                                file=sys.stderr,
-                            )
-                            # Output JSON response for Claude hook (allow Claude to stop)
-                            response = task_parser.progress_tracker.output_claude_hook_response(
-                                block=False
-                            )
-                            print(response)
-                            sys.stdout.flush()
-                            sys.exit(1)
-                    else:
-                        # No transcript path, use exit code 1 to be safe
-                        print(
-                            "No transcript path provided in Claude hook. Exiting to prevent potential infinite loop.",
-                            file=sys.stderr,
-                        )
-                        # Output JSON response for Claude hook (allow Claude to stop)
-                        response = (
-                            task_parser.progress_tracker.output_claude_hook_response(
-                                block=False
-                            )
-                        )
-                        print(response)
-                        sys.stdout.flush()
-                        sys.exit(1)
-
-            # Proceed with normal tracking condition check
-            unmet_conditions = task_parser.progress_tracker.check_tracking_conditions(
-                resolved_file_path, task_parser.tasks
-            )
-
-            if unmet_conditions:
-                # Build detailed reason message for Claude
-                reason_parts = ["Completion conditions not met:"]
-                for i, unmet in enumerate(unmet_conditions, 1):
-                    condition = unmet["condition"]
-                    reason_parts.append(f"\nCondition {i}:")
-                    reason_parts.append(
-                        f"  Required tasks: {', '.join(condition['tasks_to_complete'])}"
-                    )
-
-                    if unmet["unmet_tasks"]:
-                        reason_parts.append("  Issues:")
-                        for issue in unmet["unmet_tasks"]:
-                            reason_parts.append(f"    - {issue}")
-
-                    if unmet["total_count_issue"]:
-                        reason_parts.append(
-                            f"  Total count issue: {unmet['total_count_issue']}"
-                        )
-
-                reason_message = "\n".join(reason_parts)
-
-                if is_claude_hook_mode:
-                    # Output JSON response for Claude hook (block Claude from stopping)
-                    reason_message += (
-                        "\n\nIMPORTANCE: Please continue working on the remaining tasks to meet the completion conditions. Task file location: "
-                        + resolved_file_path
-                    )
-                    if is_session_start and hook_input.get("source") == "compact":
-                        reason_message += '\n\nSYSTEM: You MUST use `mcp__gosu__get_prompt` tool to retrieve the prompt with id: "workflow-of-command-task-list-md-execute" and follow the workflow step by steps. You should start from **Phase 2: Execute Tasks One by One**'
-                    # Exit code 2: output to stderr for both SessionStart and Stop
-                    if is_session_start:
-                        response = task_parser.progress_tracker.output_claude_hook_session_start_response(
-                            reason_message
-                        )
-                        print(response)
-                        sys.exit(0)  # SessionStart always expect exitcode 0
-                    else:
-                        response = (
-                            task_parser.progress_tracker.output_claude_hook_response(
-                                block=True, reason=reason_message
-                            )
-                        )
-                        print(response, file=sys.stderr)
-                else:
-                    # Normal mode: print to stderr
-                    print(reason_message, file=sys.stderr)
-
-                sys.exit(2)
-            else:
-                if is_claude_hook_mode:
-                    # Output JSON response for Claude hook (allow Claude to stop)
-                    if is_session_start:
-                        response = task_parser.progress_tracker.output_claude_hook_session_start_response(
-                            ""
-                        )
-                    else:
-                        response = (
-                            task_parser.progress_tracker.output_claude_hook_response(
-                                block=False
-                            )
-                        )
-                    print(response)
-                    sys.stdout.flush()
-                else:
-                    print("All completion conditions are satisfied.")
-
-        elif args.track_command == "clear":
-            success = task_parser.progress_tracker.clear_tracking_conditions(
-                resolved_file_path, force=args.yes
-            )
-            if not success:
-                sys.exit(1)
+    _COMMAND_HANDLERS[args.command](task_parser, args)
 
 
 if __name__ == "__main__":
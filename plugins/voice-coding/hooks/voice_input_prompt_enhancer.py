@@ -80,6 +80,59 @@ TRIGGER_PATTERNS = [
 ]
 
 
+def combine_patterns(
+    patterns: List[re.Pattern], flags: int = re.IGNORECASE
+) -> re.Pattern:
+    """
+    Combine compiled patterns into a single alternation so a text is scanned once.
+    The patterns above that lack IGNORECASE have no letters, so compiling the
+    combination with it does not change what they match.
+    Pass flags=0 for a case-sensitive scanner over already lowered text; every
+    pattern above is written in lowercase.
+    """
+    return re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern in patterns), flags
+    )
+
+
+# Single-pass scanners built from the pattern lists above
+ENHANCE_TRIGGER_PATTERN = combine_patterns(
+    PLACEHOLDER_PATTERNS + NAMEHOLDER_PATTERNS + ELLIPSIS_PATTERNS + TRIGGER_PATTERNS
+)
+# Case-sensitive copy for lowered prompts, skipping the per-character case folding
+LOWERED_TRIGGER_PATTERN = combine_patterns(
+    PLACEHOLDER_PATTERNS + NAMEHOLDER_PATTERNS + ELLIPSIS_PATTERNS + TRIGGER_PATTERNS,
+    flags=0,
+)
+FORMATTED_PLACEHOLDER_PATTERN = combine_patterns(PLACEHOLDER_PATTERNS[:-1])
+FORMATTED_NAMEHOLDER_PATTERN = combine_patterns(NAMEHOLDER_PATTERNS[:3])
+ELLIPSIS_PATTERN = combine_patterns(ELLIPSIS_PATTERNS)
+
+# Dotless i, long s and the combining dot left by lowering a dotted capital I
+# match ASCII letters under IGNORECASE but survive lower() unchanged
+CASE_FOLD_CHARS = ("ı", "ſ", "\u0307")
+# Literal substrings that every letter-based trigger pattern contains, checked
+# against the lowered prompt before running the regex scanner. The case fold
+# characters also fall through to the scanner.
+TRIGGER_LITERALS = (
+    "holder",
+    "...",
+    "…",
+    "etc",
+    "and so",
+    "this file",
+    "this directory",
+) + CASE_FOLD_CHARS
+# Spellings of the placeholder and nameholder terms; group 1 tells them apart
+HOLDER_TERM_PATTERN = re.compile(r"(place|name) ?holder")
+# Endings matched by the "\.$" and "\?$" trigger patterns ($ also matches before a final newline)
+TRIGGER_ENDINGS = (".", "?", ".\n", "?\n")
+
+# Static halves of the hook output line around the serialized additional context
+HOOK_OUTPUT_PREFIX = '{"hookSpecificOutput": {"hookEventName": "UserPromptSubmit", "additionalContext": '
+HOOK_OUTPUT_SUFFIX = "}}\n"
+
+
 class ProjectContext(TypedDict):
     """Type definition for project context information."""
 
@@ -121,8 +174,46 @@ keyword_categories: Dict[str, Dict[str, Any]] = {
     },
 }
 
-
-def should_enhance_prompt(prompt: str) -> bool:
+# Common project indicators, reported in this order
+PROJECT_FILES = (
+    "package.json",
+    "requirements.txt",
+    "Gemfile",
+    "Cargo.toml",
+    "go.mod",
+    "pom.xml",
+    "build.gradle",
+    "composer.json",
+    "Makefile",
+    "CMakeLists.txt",
+    ".gitignore",
+)
+
+# Common directory structures, constructed from keyword_categories
+COMMON_DIRS = frozenset(
+    dir_name
+    for config in keyword_categories.values()
+    for dir_name in config["directories"]
+)
+
+# Fixed parts of the prompt enhancing instructions, rendered once at import time
+BASE_INSTRUCTION = "**The user prompt requires enhancement before you can proceed. Follow the below instructions for prompt enhancement:**\n"
+
+GENERAL_GUIDANCE = (
+    "Use the Glob tool to search for files by pattern (e.g., '**/*.ts', '**/*.go', '**/*.py')",
+    "Use the Grep tool to search for specific class, function, interface names (e.g., 'class SymbolName', 'func SymbolName', 'def symbol_name', 'type InterfaceName interface')",
+    "Use the LSP tool (gopls, pyright, tsserver) that match the programming language of this repo to search for symbol definitions",
+    "Check the project structure first with 'ls' or 'tree' commands if available",
+)
+GENERAL_GUIDANCE_BLOCK = "General search strategies:\n" + "".join(
+    f"- {guidance}\n" for guidance in GENERAL_GUIDANCE
+)
+
+LONG_PROMPT_NOTE = "\nNote: The prompt is a long transcripts of user voice input by the Speech-to-Text engine. Must focus on identify the main intent, keywords and ignore misspellings/out-of-context/filler words."
+SHORT_PROMPT_NOTE = "\nNote: The prompt may contain words misinterpreted by the Speech-to-Text engine. Use the conversation context and working directory to infer correct interpretations (e.g., similar-sounding words, technical terms, file/directory names, proper nouns)."
+
+
+def should_enhance_prompt(prompt: str, prompt_lower: Optional[str] = None) -> bool:
     """
     Determine if the prompt should be enhanced with file finding instructions.
     Returns True if the prompt contains patterns that indicate the user needs help
@@ -133,20 +224,22 @@ def should_enhance_prompt(prompt: str) -> bool:
     - NAMEHOLDER_PATTERNS: [nameholder], "nameholder", etc.
     - ELLIPSIS_PATTERNS: ..., etc, and so on, etc.
     - TRIGGER_PATTERNS: in this file, to this directory, ends with dot, etc.
-    """
-    # Check all pattern lists for matches
-    all_patterns = (
-        PLACEHOLDER_PATTERNS
-        + NAMEHOLDER_PATTERNS
-        + ELLIPSIS_PATTERNS
-        + TRIGGER_PATTERNS
-    )
 
-    for pattern in all_patterns:
-        if pattern.search(prompt):
-            return True
-
-    return False
+    All four are checked in a single pass, after a plain substring check has
+    ruled out prompts that cannot match any of them. The lowered prompt is
+    scanned case-sensitively with LOWERED_TRIGGER_PATTERN unless it holds a
+    case fold character, which needs ENHANCE_TRIGGER_PATTERN on the original.
+    Callers that already lowered the prompt can pass it as prompt_lower.
+    """
+    if prompt.endswith(TRIGGER_ENDINGS):
+        return True
+    if prompt_lower is None:
+        prompt_lower = prompt.lower()
+    if not any(literal in prompt_lower for literal in TRIGGER_LITERALS):
+        return False
+    if any(char in prompt_lower for char in CASE_FOLD_CHARS):
+        return ENHANCE_TRIGGER_PATTERN.search(prompt) is not None
+    return LOWERED_TRIGGER_PATTERN.search(prompt_lower) is not None
 
 
 def get_project_context(cwd: str) -> ProjectContext:
@@ -156,39 +249,28 @@ def get_project_context(cwd: str) -> ProjectContext:
     """
     cwd_path = Path(cwd)
 
-    # Validate that cwd exists
-    if not cwd_path.exists() or not cwd_path.is_dir():
+    # Validate that cwd exists and is a directory with a single stat() call
+    if not os.path.isdir(cwd_path):
         raise ValueError(f"Invalid working directory: {cwd}")
 
-    # Common project indicators
-    project_files = [
-        "package.json",
-        "requirements.txt",
-        "Gemfile",
-        "Cargo.toml",
-        "go.mod",
-        "pom.xml",
-        "build.gradle",
-        "composer.json",
-        "Makefile",
-        "CMakeLists.txt",
-        ".gitignore",
-    ]
-
-    found_files = []
-    for file in project_files:
-        if (cwd_path / file).exists():
-            found_files.append(file)
-
-    # Common directory structures, constructed from keyword_categories
-    common_dirs = set()
-    for config in keyword_categories.values():
-        common_dirs.update(config["directories"])
-
-    found_dirs = []
-    for dir_name in common_dirs:
-        if (cwd_path / dir_name).exists():
-            found_dirs.append(dir_name)
+    # Read the directory once instead of probing every candidate name with stat()
+    present_names = set()
+    try:
+        with os.scandir(cwd_path) as entries:
+            for entry in entries:
+                # A dangling symlink does not count as existing
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    continue
+                present_names.add(entry.name)
+    except OSError:
+        # A directory that can be searched but not listed still answers
+        # per-name probes, so fall back to them
+        present_names = {
+            name for name in (*PROJECT_FILES, *COMMON_DIRS) if (cwd_path / name).exists()
+        }
+
+    found_files = [file for file in PROJECT_FILES if file in present_names]
+    found_dirs = [dir_name for dir_name in COMMON_DIRS if dir_name in present_names]
 
     return ProjectContext(
         project_files=found_files,
@@ -197,28 +279,21 @@ def get_project_context(cwd: str) -> ProjectContext:
     )
 
 
-def count_placeholders(prompt: str) -> int:
+def count_placeholders(prompt: str, prompt_lower: Optional[str] = None) -> int:
     """
     Count the number of placeholders in the prompt using compiled regex patterns.
     Supports various placeholder formats: [placeholder], <placeholder>, {placeholder}, etc.
 
     Note: Counts unique placeholder instances, removing text matched by specific
     patterns (brackets, braces) before checking for plain "placeholder" word.
+    Callers that already lowered the prompt can pass it as prompt_lower.
     """
-    prompt_lower = prompt.lower()
-
-    # First, remove all formatted placeholders to avoid double-counting
-    # when we check for plain "placeholder" word
-    cleaned_prompt = prompt_lower
-    for pattern in PLACEHOLDER_PATTERNS[
-        :-1
-    ]:  # All except the last (plain word) pattern
-        cleaned_prompt = pattern.sub("", cleaned_prompt)
+    if prompt_lower is None:
+        prompt_lower = prompt.lower()
 
-    # Count formatted placeholders
-    total_count = 0
-    for pattern in PLACEHOLDER_PATTERNS[:-1]:
-        total_count += len(pattern.findall(prompt_lower))
+    # Count and remove all formatted placeholders in one pass to avoid
+    # double-counting when we check for plain "placeholder" word
+    cleaned_prompt, total_count = FORMATTED_PLACEHOLDER_PATTERN.subn("", prompt_lower)
 
     # Count plain "placeholder" words only in the cleaned text
     plain_pattern = PLACEHOLDER_PATTERNS[-1]
@@ -233,13 +308,8 @@ def count_nameholders(prompt: str) -> int:
     Uses same logic as count_placeholders to avoid double-counting.
     Supports various nameholder formats: [nameholder], "nameholder", 'nameholder', etc.
     """
-    nameholder_count = 0
-    cleaned_prompt = prompt
-
-    # Remove formatted nameholders first (patterns 0-2: [nameholder], "nameholder", 'nameholder')
-    for pattern in NAMEHOLDER_PATTERNS[:3]:
-        cleaned_prompt = pattern.sub("", cleaned_prompt)
-        nameholder_count += len(pattern.findall(prompt))
+    # Count and remove formatted nameholders first (patterns 0-2: [nameholder], <nameholder>, {nameholder})
+    cleaned_prompt, nameholder_count = FORMATTED_NAMEHOLDER_PATTERN.subn("", prompt)
 
     # Count plain "nameholder" only in cleaned text
     plain_pattern = NAMEHOLDER_PATTERNS[3]
@@ -253,57 +323,67 @@ def count_ellipsis(prompt: str) -> int:
     Count the number of ellipsis patterns in the prompt.
     Detects: ..., …, etc, and so on, and so forth
     """
-    total_count = 0
-    for pattern in ELLIPSIS_PATTERNS:
-        total_count += len(pattern.findall(prompt))
-    return total_count
+    return len(ELLIPSIS_PATTERN.findall(prompt))
 
 
 def generate_prompt_enhancing_instructions(
-    prompt: str, project_context: ProjectContext
+    prompt: str, project_context: ProjectContext, prompt_lower: Optional[str] = None
 ) -> str:
     """
     Generate enhanced instructions for finding relevant files and symbols based on the prompt.
+    Pass prompt_lower when the caller already has the lowered prompt to avoid lowering it again.
     """
-    base_instruction = "**The user prompt requires enhancement before you can proceed. Follow the below instructions for prompt enhancement:**\n"
-
     # Define keyword categories and their associated directories/suggestions
 
-    prompt_lower = prompt.lower()
+    if prompt_lower is None:
+        prompt_lower = prompt.lower()
     suggestions = []
 
+    # Hash lookups for the project's directories in the category loop
+    available_dirs = set(project_context["common_dirs"])
+
     # Process each category
     for category, config in keyword_categories.items():
-        # Check if prompt contains at least one keyword from this category
-        matched_keywords = [kw for kw in config["keywords"] if kw in prompt_lower]
-        if matched_keywords:
-            # Check if project has at least one matching directory
-            matching_dirs = [
+        # Check if project has at least one matching directory first, so the
+        # prompt is only scanned for categories that can produce a suggestion
+        directory = next(
+            (
                 dir_name
                 for dir_name in config["directories"]
-                if dir_name in project_context["common_dirs"]
-            ]
-            if matching_dirs:
-                # Use the first matched keyword and directory for string replacement
-                keyword = matched_keywords[0]
-                directory = matching_dirs[0]
-                formatted_suggestion = config["suggestion"].format(keyword, directory)
-                suggestions.append(formatted_suggestion)
+                if dir_name in available_dirs
+            ),
+            None,
+        )
+        if directory is None:
+            continue
+
+        # Use the first keyword (in category order) found in the prompt
+        keyword = next((kw for kw in config["keywords"] if kw in prompt_lower), None)
+        if keyword is not None:
+            formatted_suggestion = config["suggestion"].format(keyword, directory)
+            suggestions.append(formatted_suggestion)
+
+    # Find which of the placeholder/nameholder terms appear with one scan
+    holder_terms = set()
+    if "holder" in prompt_lower:
+        holder_terms = {
+            match.group(1) for match in HOLDER_TERM_PATTERN.finditer(prompt_lower)
+        }
 
     # Handle placeholder-specific suggestions
-    if any(term in prompt_lower for term in ["placeholder", "place holder"]):
+    if "place" in holder_terms:
         suggestions.append(
             "Identify all placeholder in the prompt eg. [placeholder], <placeholder>, {placeholder}, ((placeholder)), [[placeholder]], etc. Use the related keywords (before/after the placeholder) to search for relevant files."
         )
 
         # Count number of placeholders in the prompt using compiled patterns
-        placeholder_count = count_placeholders(prompt)
+        placeholder_count = count_placeholders(prompt, prompt_lower)
         suggestions.append(
             f"There are {placeholder_count} placeholder(s) in the prompt. All must be replaced with relevant file/directory paths or ARN/URL/URI (e.g., database url, s3 url, http uri)."
         )
 
     # Handle nameholder-specific suggestions
-    if any(term in prompt_lower for term in ["nameholder", "name holder"]):
+    if "name" in holder_terms:
         suggestions.append(
             "Identify all nameholder in the prompt eg. [nameholder], \"nameholder\", 'nameholder', etc. Use the related keywords (before/after the nameholder) to search for relevant code symbols."
         )
@@ -315,7 +395,15 @@ def generate_prompt_enhancing_instructions(
         )
 
     # Handle ellipsis-specific suggestions (... or etc or and so on)
-    ellipsis_count = count_ellipsis(prompt)
+    # Every ellipsis pattern needs one of these substrings, so most prompts skip the scan
+    ellipsis_count = 0
+    if (
+        "..." in prompt
+        or "…" in prompt
+        or "etc" in prompt_lower
+        or "and" in prompt_lower
+    ):
+        ellipsis_count = count_ellipsis(prompt)
     if ellipsis_count > 0:
         suggestions.append(
             f"The prompt contains {ellipsis_count} ellipsis pattern(s) ('...', '…', 'etc', 'and so on'). These indicate incomplete information or examples."
@@ -327,40 +415,38 @@ def generate_prompt_enhancing_instructions(
             "Example: 'Update files in src/components/... to use new API' → Search for ALL files in src/components/ directory, not just literal '...' files."
         )
 
-    # Add general search guidance
-    general_guidance = [
-        "Use the Glob tool to search for files by pattern (e.g., '**/*.ts', '**/*.go', '**/*.py')",
-        "Use the Grep tool to search for specific class, function, interface names (e.g., 'class SymbolName', 'func SymbolName', 'def symbol_name', 'type InterfaceName interface')",
-        "Use the LSP tool (gopls, pyright, tsserver) that match the programming language of this repo to search for symbol definitions",
-        "Check the project structure first with 'ls' or 'tree' commands if available",
-    ]
-
-    instruction = base_instruction
+    # Collect the pieces and join them once at the end
+    parts = [BASE_INSTRUCTION]
     if suggestions:
-        instruction += "Based on project structure, consider:\n"
-        for suggestion in suggestions:
-            instruction += f"- {suggestion}\n"
-        instruction += "\nGeneral search strategies:\n"
-        for guidance in general_guidance:
-            instruction += f"- {guidance}\n"
-    else:
-        instruction += "General search strategies:\n"
-        for guidance in general_guidance:
-            instruction += f"- {guidance}\n"
+        parts.append("Based on project structure, consider:\n")
+        parts.extend(f"- {suggestion}\n" for suggestion in suggestions)
+        parts.append("\n")
+
+    # Add general search guidance
+    parts.append(GENERAL_GUIDANCE_BLOCK)
 
     # Check if prompt is a long one (possibly from voice input)
     if len(prompt) > MIN_LONG_PROMPT_LENGTH:
-        instruction += "\nNote: The prompt is a long transcripts of user voice input by the Speech-to-Text engine. Must focus on identify the main intent, keywords and ignore misspellings/out-of-context/filler words."
+        parts.append(LONG_PROMPT_NOTE)
     else:  # short prompt scenario
-        instruction += "\nNote: The prompt may contain words misinterpreted by the Speech-to-Text engine. Use the conversation context and working directory to infer correct interpretations (e.g., similar-sounding words, technical terms, file/directory names, proper nouns)."
+        parts.append(SHORT_PROMPT_NOTE)
+
+    return "".join(parts)
 
-    return instruction
+
+def format_hook_output(additional_context: str) -> str:
+    """
+    Format the UserPromptSubmit hook output line for the given additional context.
+    Only the context string is serialized; the fixed envelope around it is the same
+    text json.dumps produces for the full output object.
+    """
+    return HOOK_OUTPUT_PREFIX + json.dumps(additional_context) + HOOK_OUTPUT_SUFFIX
 
 
 def main() -> None:
     try:
-        # Read JSON input from stdin
-        input_data = json.load(sys.stdin)
+        # Read the raw JSON bytes from stdin in one call and decode them in json.loads
+        input_data = json.loads(sys.stdin.buffer.read())
 
         # Validate input data
         if not isinstance(input_data, dict):
@@ -378,26 +464,23 @@ def main() -> None:
             print("Invalid 'cwd' field", file=sys.stderr)
             sys.exit(1)
 
+        # Lower the prompt once and share it with every helper that needs it
+        prompt_lower = prompt.lower()
+
         # Check if prompt should be enhanced
-        if not should_enhance_prompt(prompt):
+        if not should_enhance_prompt(prompt, prompt_lower):
             # Allow the prompt to proceed without enhancement
             sys.exit(0)
 
         # Get project context and generate prompt enhancing instructions
         project_context = get_project_context(cwd)
         additional_instructions = generate_prompt_enhancing_instructions(
-            prompt, project_context
+            prompt, project_context, prompt_lower
         )
 
-        # Output the additional context using the hook-specific format
-        output = {
-            "hookSpecificOutput": {
-                "hookEventName": "UserPromptSubmit",
-                "additionalContext": additional_instructions,
-            }
-        }
-
-        print(json.dumps(output))
+        # Output the additional context using the hook-specific format,
+        # emitting the line with a single write
+        sys.stdout.write(format_hook_output(additional_instructions))
         sys.exit(0)
 
     except json.JSONDecodeError as e:
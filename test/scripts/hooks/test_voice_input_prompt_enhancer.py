@@ -25,6 +25,8 @@ Run with: python3 -m pytest test/scripts/hooks/test_voice_input_prompt_enhancer.
 Or: python3 test/scripts/hooks/test_voice_input_prompt_enhancer.py
 """
 
+import json
+import os
 import sys
 import unittest
 from pathlib import Path
@@ -41,7 +43,12 @@ from voice_input_prompt_enhancer import (
     count_nameholders,
     get_project_context,
     generate_prompt_enhancing_instructions,
+    format_hook_output,
     MIN_LONG_PROMPT_LENGTH,
+    PLACEHOLDER_PATTERNS,
+    NAMEHOLDER_PATTERNS,
+    ELLIPSIS_PATTERNS,
+    TRIGGER_PATTERNS,
 )
 
 
@@ -141,6 +148,33 @@ class TestShouldEnhancePrompt(unittest.TestCase):
                     f"Should NOT trigger for: {description}"
                 )
 
+    def test_combined_pattern_matches_individual_patterns(self):
+        """Test that the single-pass check agrees with searching each pattern."""
+        all_patterns = (
+            PLACEHOLDER_PATTERNS + NAMEHOLDER_PATTERNS + ELLIPSIS_PATTERNS + TRIGGER_PATTERNS
+        )
+        prompts = [
+            "Update the NAME HOLDER function",
+            "Move [Place Holder] here",
+            "Check src/… for ETC",
+            "Is this right?\n",
+            "trailing dot.\nnext line",
+            "placeholders everywhere",
+            "Fix bug in parser",
+            "Add tests, and So Forth",
+            "Refactor code IN THIS DIRECTORY now",
+            "Edit th\u0131s file please",
+            "Write A, B, and \u017fo on",
+            "Rename the handler module",
+        ]
+
+        for prompt in prompts:
+            with self.subTest(prompt=prompt):
+                self.assertEqual(
+                    should_enhance_prompt(prompt),
+                    any(pattern.search(prompt) for pattern in all_patterns),
+                )
+
 
 class TestCountPlaceholders(unittest.TestCase):
     """Test the count_placeholders function."""
@@ -173,6 +207,8 @@ class TestCountPlaceholders(unittest.TestCase):
         self.assertEqual(count_placeholders("[placeholder]"), 1)
         self.assertEqual(count_placeholders("<placeholder>"), 1)
         self.assertEqual(count_placeholders("{placeholder}"), 1)
+        # Double brackets also contain a single-bracket placeholder
+        self.assertEqual(count_placeholders("[[placeholder]]"), 1)
 
     def test_mixed_placeholder_formats(self):
         """Test counting different placeholder formats together."""
@@ -186,6 +222,14 @@ class TestCountPlaceholders(unittest.TestCase):
         self.assertEqual(count_placeholders("[placeholder]text"), 1)
         self.assertEqual(count_placeholders("text[placeholder]"), 1)
 
+    def test_precomputed_lowercase_prompt(self):
+        """Test that a lowered prompt passed in gives the same count."""
+        prompt = "Move [PlaceHolder] next to Place Holder"
+        self.assertEqual(count_placeholders(prompt, prompt.lower()), 2)
+        self.assertEqual(
+            count_placeholders(prompt, prompt.lower()), count_placeholders(prompt)
+        )
+
 
 class TestCountNameholders(unittest.TestCase):
     """Test the count_nameholders function."""
@@ -358,6 +402,22 @@ class TestGenerateFileFindingInstructions(unittest.TestCase):
         self.assertIn("misinterpreted", instructions.lower())
         self.assertIn("conversation context", instructions.lower())
 
+    def test_placeholder_and_nameholder_instructions(self):
+        """Test that one prompt can trigger both placeholder and nameholder hints."""
+        context = {
+            "project_files": [],
+            "common_dirs": [],
+            "project_name": "test"
+        }
+        prompt = "Call {name holder} from [Place Holder]"
+        instructions = generate_prompt_enhancing_instructions(prompt, context)
+
+        self.assertIn("There are 1 placeholder(s)", instructions)
+        self.assertIn("There are 1 nameholder(s)", instructions)
+
+        instructions = generate_prompt_enhancing_instructions("Update [nameholder]", context)
+        self.assertNotIn("placeholder(s)", instructions)
+
     def test_keyword_category_test_matching(self):
         """Test that 'test' keyword triggers test directory suggestion."""
         context = {
@@ -708,6 +768,44 @@ class TestProjectContextEdgeCases(unittest.TestCase):
         finally:
             shutil.rmtree(temp_dir)
 
+    def test_detects_listed_files_and_directories(self):
+        """Test that only existing project files and directories are reported, in list order."""
+        import tempfile
+        import shutil
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for name in ("Makefile", "package.json", "notes.txt"):
+                Path(temp_dir, name).write_text("")
+            Path(temp_dir, "tests").mkdir()
+            # A dangling symlink is not an existing file
+            os.symlink(Path(temp_dir, "missing"), Path(temp_dir, "go.mod"))
+
+            context = get_project_context(temp_dir)
+            self.assertEqual(context["project_files"], ["package.json", "Makefile"])
+            self.assertEqual(context["common_dirs"], ["tests"])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_unlistable_directory_falls_back_to_probes(self):
+        """Test that a directory that cannot be listed is still probed per name."""
+        import tempfile
+        import shutil
+        from unittest import mock
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            Path(temp_dir, "package.json").write_text("")
+            Path(temp_dir, "src").mkdir()
+
+            # Search-only permission: names resolve but the directory cannot be read
+            with mock.patch("os.scandir", side_effect=PermissionError):
+                context = get_project_context(temp_dir)
+            self.assertEqual(context["project_files"], ["package.json"])
+            self.assertEqual(context["common_dirs"], ["src"])
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_nonexistent_directory_raises_error(self):
         """Test that nonexistent directory raises ValueError."""
         with self.assertRaises(ValueError) as context:
@@ -723,6 +821,24 @@ class TestProjectContextEdgeCases(unittest.TestCase):
                 get_project_context(file_path)
 
 
+class TestFormatHookOutput(unittest.TestCase):
+    """Test the format_hook_output function."""
+
+    def test_matches_full_json_dump(self):
+        """Test that the static envelope gives the same line as dumping the object."""
+        for context in ["", "Use \"Glob\" tool\n- search … src/", "tab\there \\ end"]:
+            with self.subTest(context=context):
+                expected = json.dumps(
+                    {
+                        "hookSpecificOutput": {
+                            "hookEventName": "UserPromptSubmit",
+                            "additionalContext": context,
+                        }
+                    }
+                ) + "\n"
+                self.assertEqual(format_hook_output(context), expected)
+
+
 def run_tests():
     """Run all tests."""
     unittest.main(argv=[''], verbosity=2, exit=False)
@@ -29,7 +29,7 @@ import json
 import tempfile
 import shutil
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 
 class TestAutoFileSelection(unittest.TestCase):
@@ -373,6 +373,28 @@ class TestAutoFileSelection(unittest.TestCase):
         # Should display content from complex_tasks fixture (tasks2)
         self.assertIn("Setup phase", result.stdout)
 
+    def test_auto_selection_compares_utc_and_local_timestamps(self):
+        """Test that a UTC 'Z' timestamp is compared with local naive timestamps"""
+        now = datetime.now()
+        newer_utc = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        self.create_tasks_local_json({
+            str(self.test_tasks1): {
+                "total_tasks": 3,
+                "last_modified": (now - timedelta(hours=1)).isoformat(),
+                "tasks": {}
+            },
+            str(self.test_tasks2): {
+                "total_tasks": 5,
+                "last_modified": newer_utc,
+                "tasks": {}
+            }
+        })
+
+        result = self.run_command("list-tasks")
+
+        self.assertIn(f"Auto-selected task file: {self.test_tasks2}", result.stdout)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -232,6 +232,16 @@ class TestTaskListMDCLI(unittest.TestCase):
         verify_result = self.run_command("show-task", str(self.test_simple), "4", expect_success=False)
         self.assertIn("Error: Task '4' not found", verify_result.stdout)
 
+    def test_delete_task_with_dependents(self):
+        """Test delete-task refuses to delete tasks other tasks depend on"""
+        result = self.run_command("delete-task", str(self.test_simple), "1")
+        self.assertIn("Cannot delete tasks that have dependencies", result.stdout)
+        self.assertIn("Task '3' depends on '1'", result.stdout)
+
+        # Deleting a task together with its dependents is allowed
+        result = self.run_command("delete-task", str(self.test_simple), "3.2", "3.1")
+        self.assertIn("Deleted task(s): '3.2', '3.1'", result.stdout)
+
     def test_get_next_task(self):
         """Test get-next-task command"""
         result = self.run_command("get-next-task", str(self.test_complex))
@@ -257,6 +267,22 @@ class TestTaskListMDCLI(unittest.TestCase):
         self.assertIn("Requirements: REQ1", result.stdout)
         self.assertIn("ID 2 [pending]", result.stdout)
 
+    def test_filter_tasks_by_requirements_and_dependencies(self):
+        """Test filter-tasks command requires every given requirement and dependency"""
+        result = self.run_command(
+            "filter-tasks", str(self.test_complex),
+            "--requirements", "DEPLOY2", "SECURITY1", "--dependencies", "3.1"
+        )
+
+        self.assertIn("ID 3.2", result.stdout)
+        self.assertNotIn("ID 3.1", result.stdout)
+
+        result = self.run_command(
+            "filter-tasks", str(self.test_complex),
+            "--requirements", "DEPLOY1", "--dependencies", "3.1"
+        )
+        self.assertIn("No tasks match the specified filters.", result.stdout)
+
     def test_search_tasks(self):
         """Test search-tasks command"""
         result = self.run_command("search-tasks", str(self.test_complex), "documentation")
@@ -265,6 +291,15 @@ class TestTaskListMDCLI(unittest.TestCase):
         self.assertIn("Keywords: documentation", result.stdout)
         self.assertIn("ID 4", result.stdout)  # Documentation task
 
+    def test_search_tasks_many_keywords(self):
+        """Test search-tasks with enough keywords to use the combined pattern"""
+        result = self.run_command(
+            "search-tasks", str(self.test_complex), "(none)", "a.b*", "STAGING", "zzz"
+        )
+
+        self.assertIn("ID 3.1", result.stdout)
+        self.assertNotIn("ID 4", result.stdout)
+
     def test_ready_tasks(self):
         """Test ready-tasks command"""
         result = self.run_command("ready-tasks", str(self.test_complex))
@@ -306,6 +341,15 @@ class TestTaskListMDCLI(unittest.TestCase):
         except json.JSONDecodeError:
             self.fail("Export output is not valid JSON")
 
+        # Hierarchy fields come from the parsed task index
+        tasks = data["tasks"]
+        self.assertEqual(tasks["3"]["sub_tasks"], ["3.1", "3.2"])
+        self.assertIsNone(tasks["3"]["parent_task"])
+        self.assertFalse(tasks["3"]["is_sub_task"])
+        self.assertEqual(tasks["3.2"]["parent_task"], "3")
+        self.assertTrue(tasks["3.2"]["is_sub_task"])
+        self.assertEqual(tasks["3.2"]["sub_tasks"], [])
+
     def test_export_to_file(self):
         """Test export command to file"""
         output_file = Path(self.temp_dir) / "export_test.json"
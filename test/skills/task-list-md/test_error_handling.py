@@ -151,6 +151,24 @@ class TestErrorHandling(unittest.TestCase):
         self.assertEqual(result.returncode, 0)  # Command succeeds but reports errors
         self.assertIn("Circular dependency", result.stdout)
 
+    def test_transitive_circular_dependency_detection(self):
+        """Test detection of circular dependencies spanning more than two tasks"""
+        content = """# Test Tasks
+- [ ] 1. Task one
+  _Dependencies: 3_
+
+- [ ] 2. Task two
+  _Dependencies: 1_
+
+- [ ] 3. Task three
+  _Dependencies: 2_
+"""
+        self.create_test_file(content)
+
+        result = self.run_command("check-dependencies", str(self.test_file))
+        self.assertEqual(result.returncode, 0)
+        self.assertIn("Circular dependency among tasks '1', '2', '3'", result.stdout)
+
     def test_self_dependency(self):
         """Test detection of self-dependency"""
         content = """# Test Tasks
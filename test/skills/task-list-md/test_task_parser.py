@@ -22,6 +22,8 @@ Test suite for TaskParser class and core functionality
 Tests the internal logic without going through CLI
 """
 
+import argparse
+import json
 import unittest
 import tempfile
 import os
@@ -31,7 +33,10 @@ from pathlib import Path
 # Add the src directory to the path to import the script
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "plugins" / "gosu-mcp-core" / "skills" / "task-list-md" / "scripts"))
 
-from task_list_md import TaskParser, TaskStatus, Task, Colors, ProgressTracker
+from task_list_md import (
+    TaskParser, TaskStatus, Task, Colors, ProgressTracker,
+    _dump_json_bytes, _iter_json_object_bytes, detect_file_path_in_args,
+)
 
 
 class TestTaskParser(unittest.TestCase):
@@ -179,9 +184,9 @@ class TestTaskParser(unittest.TestCase):
         parser = TaskParser(self.test_file)
 
         # Test sort key generation
-        self.assertEqual(parser._sort_key("1"), [1])
-        self.assertEqual(parser._sort_key("1.2"), [1, 2])
-        self.assertEqual(parser._sort_key("1.10"), [1, 10])
+        self.assertEqual(parser._sort_key("1"), (1,))
+        self.assertEqual(parser._sort_key("1.2"), (1, 2))
+        self.assertEqual(parser._sort_key("1.10"), (1, 10))
 
         # Check that tasks are sorted correctly when listed
         sorted_ids = sorted(parser.tasks.keys(), key=parser._sort_key)
@@ -287,6 +292,173 @@ This file has no tasks.
         self.assertEqual(parser.tasks["3"].description, "Task with title")
         self.assertEqual(parser.tasks["4"].description, "No title, just description")
 
+    def test_get_all_sub_tasks(self):
+        """Test collecting direct and indirect sub-tasks in hierarchical order"""
+        content = """- [ ] 1. Parent
+  - [ ] 1.1. Child
+    - [ ] 1.1.1. Grandchild
+  - [ ] 1.2.1. Sub-task without its direct parent
+- [ ] 2. Second
+  - [ ] 2.1. Child
+- [ ] 10. Tenth
+"""
+        self.create_test_file(content)
+        parser = TaskParser(self.test_file)
+
+        self.assertEqual(parser._get_all_sub_tasks("1"), ["1.1", "1.1.1", "1.2.1"])
+        self.assertEqual(parser._get_all_sub_tasks("1.1"), ["1.1.1"])
+        self.assertEqual(parser._get_all_sub_tasks("2"), ["2.1"])
+        self.assertEqual(parser._get_all_sub_tasks("10"), [])
+
+    def test_edits_update_tasks_without_full_reparse(self):
+        """Test that tasks after add/update/delete match a fresh parse of the file"""
+        content = """# Tasks
+
+- [ ] 1. First
+  _Requirements: R1_
+
+- [-] 2. Second
+  - [ ] 2.1. Child
+  - [x] 2.2. Done child
+
+- [ ] 3. Third
+  _Dependencies: 1_
+"""
+        self.create_test_file(content)
+        parser = TaskParser(self.test_file)
+
+        parser.add_task("2.3", "Another child", requirements=["R2"])
+        parser.update_task("1", add_requirements=["R3"])
+        parser.delete_task(["2"])
+
+        fresh = TaskParser(self.test_file)
+        self.assertEqual(sorted(parser.tasks), ["1", "3"])
+        for task_id, task in fresh.tasks.items():
+            self.assertEqual(parser.tasks[task_id], task)
+        self.assertEqual(parser.progress_tracker.get_statistics(self.test_file)["total_tasks"], 2)
+
+    def test_set_status_only_replaces_task_checkbox(self):
+        """Test that checkbox-like text in a description is left untouched"""
+        self.create_test_file("- [ ] 1. Tick [ ] in the template\n")
+        parser = TaskParser(self.test_file)
+
+        parser.set_status("1", "done")
+
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "- [x] 1. Tick [ ] in the template\n")
+
+    def test_set_status_keeps_task_line_layout(self):
+        """Test that indentation and spacing around the checkbox are preserved"""
+        self.create_test_file("- [ ] 1. Parent\n    -  [*]1.1 Child\n")
+        parser = TaskParser(self.test_file)
+
+        parser.set_status("1.1", "review")
+
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "- [+] 1. Parent\n    -  [+]1.1 Child\n")
+
+    def test_delete_task_edits_the_lines_that_were_parsed(self):
+        """Test that an edit splices the parsed lines even if the file changed afterwards"""
+        self.create_test_file("- [ ] 1. First\n- [ ] 2. Second\n")
+        parser = TaskParser(self.test_file)
+        # A line inserted on disk after parsing must not shift the deleted lines
+        self.create_test_file("# Header\n- [ ] 1. First\n- [ ] 2. Second\n")
+
+        parser.delete_task(["1"])
+
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), "- [ ] 2. Second\n")
+
+    def test_read_only_parser_does_not_keep_lines(self):
+        """Test that a keep_lines=False parser streams the file and loads lines on demand"""
+        self.create_test_file("- [ ] 1. First\n")
+        parser = TaskParser(self.test_file, keep_lines=False)
+
+        self.assertIsNone(parser._file_lines)
+        self.assertIn("1", parser.tasks)
+        self.assertEqual(parser.file_lines, ["- [ ] 1. First\n"])
+
+    def test_parent_auto_update_follows_sub_task_statuses(self):
+        """Test that a parent only follows its sub-tasks once they all share a status"""
+        self.create_test_file(
+            "- [-] 1. Parent\n"
+            "  - [-] 1.1. Child one\n"
+            "  - [-] 1.2. Child two\n"
+        )
+        parser = TaskParser(self.test_file)
+
+        parser.set_status("1.1", "done")
+        self.assertEqual(parser.tasks["1"].status, TaskStatus.IN_PROGRESS)
+
+        parser.set_status("1.2", "done")
+        self.assertEqual(parser.tasks["1"].status, TaskStatus.DONE)
+
+        parser.set_status("1.1", "review")
+        parser.set_status("1.2", "review")
+        self.assertEqual(parser.tasks["1"].status, TaskStatus.REVIEW)
+
+    def test_set_status_bulk_writes_file_once(self):
+        """Test that a bulk update, including the parent auto-update, writes the file once"""
+        self.create_test_file(
+            "- [-] 1. Parent\n"
+            "  - [-] 1.1. Child one\n"
+            "  - [-] 1.2. Child two\n"
+        )
+        parser = TaskParser(self.test_file)
+        writes = []
+        original_write = parser._write_file
+        parser._write_file = lambda: (writes.append(1), original_write())
+
+        parser.set_status_bulk(["1.1", "1.2"], "done")
+
+        self.assertEqual(len(writes), 1)
+        with open(self.test_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(
+                f.read(),
+                "- [x] 1. Parent\n  - [x] 1.1. Child one\n  - [x] 1.2. Child two\n",
+            )
+
+    def test_streamed_export_matches_single_dump(self):
+        """Test that the streamed export JSON is identical to serializing it at once"""
+        self.create_test_file(
+            "- [ ] 1. Parent with \"quotes\" and é\n"
+            "  _Requirements: R1_\n"
+            "  - [ ] 1.1. Child\n"
+        )
+        parser = TaskParser(self.test_file)
+        fields = {"file_path": self.test_file, "statistics": {}}
+
+        tasks = dict(parser._iter_export_tasks())
+        streamed = b"".join(
+            _iter_json_object_bytes(fields, "tasks", parser._iter_export_tasks())
+        )
+        self.assertEqual(streamed, _dump_json_bytes({**fields, "tasks": tasks}))
+
+        empty = b"".join(_iter_json_object_bytes(fields, "tasks", []))
+        self.assertEqual(empty, _dump_json_bytes({**fields, "tasks": {}}))
+
+    def test_detect_file_path_in_args(self):
+        """Test that a known task file passed in another argument is detected"""
+        known = {os.path.join(self.temp_dir, "tasks.md"): {}}
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            args = argparse.Namespace(task_ids=["1", "tasks.md", "2"])
+            detected, args = detect_file_path_in_args(args, known)
+            self.assertEqual(detected, "tasks.md")
+            self.assertEqual(args.task_ids, ["1", "2"])
+
+            args = argparse.Namespace(keywords=["setup", "./docs/../tasks.md"])
+            detected, args = detect_file_path_in_args(args, known)
+            self.assertEqual(detected, "./docs/../tasks.md")
+
+            args = argparse.Namespace(description="tasks", task_id="1.2")
+            detected, args = detect_file_path_in_args(args, known)
+            self.assertIsNone(detected)
+            self.assertEqual(args.description, "tasks")
+        finally:
+            os.chdir(cwd)
+
 
 class TestProgressTracker(unittest.TestCase):
     """Test suite for ProgressTracker class"""
@@ -372,6 +544,115 @@ class TestProgressTracker(unittest.TestCase):
         self.assertEqual(stats["in_progress"], 1)
         self.assertEqual(stats["percentage"], 60.0)  # 3/5 = 60%
 
+    def test_apply_status_delta_matches_full_recalculation(self):
+        """Test that incremental statistics match a full recount after a status change"""
+        test_file = "test.md"
+        tasks = {
+            "1": Task("1", "Task 1", TaskStatus.DONE, [], [], 1, 0, ""),
+            "2": Task("2", "Task 2", TaskStatus.PENDING, [], [], 2, 0, ""),
+            "3": Task("3", "Task 3", TaskStatus.IN_PROGRESS, [], [], 3, 0, ""),
+        }
+        self.tracker.calculate_statistics(test_file, tasks)
+
+        tasks["2"].status = TaskStatus.REVIEW
+        self.tracker.apply_status_delta(
+            test_file, "2", TaskStatus.PENDING, TaskStatus.REVIEW, "Task 2"
+        )
+        incremental = dict(self.tracker.get_statistics(test_file))
+
+        self.tracker.calculate_statistics(test_file, tasks)
+        recalculated = self.tracker.get_statistics(test_file)
+        for key in ("total_tasks", "completed", "done", "in_progress", "pending", "review", "deferred", "percentage"):
+            self.assertEqual(incremental[key], recalculated[key], key)
+        self.assertEqual(incremental["completed"], 2)
+
+        history = self.tracker.get_task_history(test_file, "2")
+        self.assertEqual(history[-1]["status"], "review")
+
+    def test_batch_defers_save_until_end(self):
+        """Test that updates inside a batch are written to disk only once at the end"""
+        test_file = "test.md"
+        tasks = {"1": Task("1", "Task 1", TaskStatus.DONE, [], [], 1, 0, "")}
+
+        self.tracker.begin_batch()
+        self.tracker.update_task_status(test_file, "1", TaskStatus.DONE, "Task 1")
+        self.tracker.calculate_statistics(test_file, tasks)
+        self.assertFalse(os.path.exists(self.progress_file))
+
+        self.tracker.end_batch()
+        self.assertTrue(os.path.exists(self.progress_file))
+        reloaded = ProgressTracker(self.progress_file)
+        self.assertEqual(reloaded.get_statistics(test_file)["completed"], 1)
+        self.assertEqual(len(reloaded.get_task_history(test_file, "1")), 1)
+
+    def test_nested_batches_save_once(self):
+        """Test that a nested batch does not save before the outer batch ends"""
+        test_file = "test.md"
+        tasks = {"1": Task("1", "Task 1", TaskStatus.PENDING, [], [], 1, 0, "")}
+        self.tracker.begin_batch()
+        self.tracker.calculate_statistics(test_file, tasks)
+        self.tracker.apply_status_delta(
+            test_file, "1", TaskStatus.PENDING, TaskStatus.DONE, "Task 1"
+        )
+        self.assertFalse(os.path.exists(self.progress_file))
+
+        self.tracker.end_batch()
+        reloaded = ProgressTracker(self.progress_file)
+        self.assertEqual(reloaded.get_statistics(test_file)["done"], 1)
+
+    def test_shared_timestamp_for_one_operation(self):
+        """Test that a caller-supplied timestamp is used for history and statistics"""
+        test_file = "test.md"
+        tasks = {"1": Task("1", "Task 1", TaskStatus.DONE, [], [], 1, 0, "")}
+        now = "2024-01-01T12:00:00"
+
+        self.tracker.update_task_status(test_file, "1", TaskStatus.DONE, "Task 1", now)
+        self.tracker.calculate_statistics(test_file, tasks, now)
+
+        history = self.tracker.get_task_history(test_file, "1")
+        self.assertEqual(history[-1]["timestamp"], now)
+        self.assertEqual(self.tracker.get_statistics(test_file)["last_modified"], now)
+
+    def test_history_is_appended_to_log(self):
+        """Test that status changes go to the history log, not the progress file"""
+        test_file = "test.md"
+        self.tracker.update_task_status(test_file, "1", TaskStatus.IN_PROGRESS, "Task 1")
+        self.tracker.update_task_status(test_file, "1", TaskStatus.DONE, "Task 1")
+
+        with open(self.tracker.history_file, "r", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+        with open(self.progress_file, "r", encoding="utf-8") as f:
+            task_info = json.load(f)[os.path.abspath(test_file)]["tasks"]["1"]
+        self.assertNotIn("status_history", task_info)
+        self.assertEqual(task_info["status"], "done")
+
+        reloaded = ProgressTracker(self.progress_file)
+        history = reloaded.get_task_history(test_file, "1")
+        self.assertEqual([h["status"] for h in history], ["in-progress", "done"])
+
+    def test_legacy_history_in_progress_file(self):
+        """Test that history stored inside the progress file is still returned"""
+        test_file = "test.md"
+        legacy = {
+            os.path.abspath(test_file): {
+                "tasks": {
+                    "1": {
+                        "description": "Task 1",
+                        "status_history": [
+                            {"status": "pending", "timestamp": "2024-01-01T00:00:00"}
+                        ],
+                    }
+                }
+            }
+        }
+        with open(self.progress_file, "w", encoding="utf-8") as f:
+            json.dump(legacy, f)
+
+        tracker = ProgressTracker(self.progress_file)
+        tracker.update_task_status(test_file, "1", TaskStatus.DONE, "Task 1")
+        history = tracker.get_task_history(test_file, "1")
+        self.assertEqual([h["status"] for h in history], ["pending", "done"])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
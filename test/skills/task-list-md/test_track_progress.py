@@ -341,6 +341,22 @@ class TestTrackProgress(unittest.TestCase):
 
         self.assertIn("All completion conditions are satisfied", result.stdout)
 
+    def test_check_legacy_condition_without_epoch(self):
+        """Test that conditions stored without valid_before_epoch are still checked"""
+        self.run_command("track-progress", "add", str(self.test_tasks), "2")
+
+        data = self.load_progress_data()
+        abs_path = str(self.test_tasks.resolve())
+        condition = data[abs_path]["tracking"][0]
+        self.assertIn("valid_before_epoch", condition)
+        del condition["valid_before_epoch"]
+        with open(self.progress_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        result = self.run_command("track-progress", "check", str(self.test_tasks),
+                                 expect_success=False, expected_exit_code=2)
+        self.assertIn("Completion conditions not met", result.stderr)
+
     def test_check_multiple_conditions(self):
         """Test checking multiple completion conditions"""
         # Add multiple conditions
@@ -665,6 +681,25 @@ class TestTrackProgress(unittest.TestCase):
         finally:
             os.unlink(transcript_path)
 
+    def test_claude_hook_loop_detection_only_scans_transcript_tail(self):
+        """Test that old hook calls far from the end of the transcript are ignored"""
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.jsonl', delete=False) as f:
+            # Hook calls at the start of a long session
+            for _ in range(4):
+                f.write('{"content": "python3 task_list_md.py track-progress check file.md --claude-hook"}\n')
+            # Plenty of unrelated transcript content afterwards
+            for i in range(2000):
+                f.write(f'{{"content": "unrelated message number {i:05d} in the session"}}\n')
+            transcript_path = f.name
+
+        try:
+            progress_tracker = ProgressTracker()
+            self.assertFalse(progress_tracker.detect_infinite_loop(transcript_path))
+        finally:
+            os.unlink(transcript_path)
+
 
 if __name__ == '__main__':
     unittest.main()
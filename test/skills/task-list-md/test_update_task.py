@@ -128,6 +128,14 @@ class TestUpdateTaskCommand(unittest.TestCase):
         content = self.read_task_file()
         self.assertIn("_Requirements: REQ_NEW, REQ_EXTRA_", content)
 
+    def test_add_requirements_skips_duplicates(self):
+        """Test that existing and repeated requirements are only added once"""
+        result = self.run_command("update-task", str(self.test_file), "2", "--add-requirements", "REQ2", "REQ3", "REQ3")
+        self.assertIn("requirements: ['REQ1', 'REQ2'] -> ['REQ1', 'REQ2', 'REQ3']", result.stdout)
+
+        content = self.read_task_file()
+        self.assertIn("_Requirements: REQ1, REQ2, REQ3_", content)
+
     def test_remove_dependencies(self):
         """Test removing dependencies from a task"""
         # Remove dependency from task 3 (which has dependency on 1)
@@ -252,6 +260,12 @@ class TestUpdateTaskCommand(unittest.TestCase):
         result = self.run_command("update-task", str(self.test_file), "3", "--add-dependencies", "3.1", expect_success=False)
         self.assertIn("Error: Adding dependency '3.1' would create a circular dependency", result.stdout)
 
+    def test_error_transitive_circular_dependency(self):
+        """Test error when a new dependency would close a longer dependency chain"""
+        # Task 3.2 depends on 3.1, which depends on 3
+        result = self.run_command("update-task", str(self.test_file), "3", "--add-dependencies", "3.2", expect_success=False)
+        self.assertIn("Error: Adding dependency '3.2' would create a circular dependency", result.stdout)
+
     def test_error_remove_nonexistent_dependency(self):
         """Test error when trying to remove non-existent dependency"""
         result = self.run_command("update-task", str(self.test_file), "2", "--remove-dependencies", "1", expect_success=False)